@@ -0,0 +1,96 @@
+"""API 응답 인코딩: 빠른 JSON 직렬화 + Accept-Encoding 협상 압축"""
+import gzip
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성: 없으면 Flask 기본 json 사용
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성: 없으면 gzip만 사용
+    brotli = None
+
+
+# 이 크기 미만 응답은 압축 이득보다 CPU 비용이 커서 그대로 보냄
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/csv'}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # 동적 응답용 (정적 번들은 빌드 시 11)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson 기반 JSON 프로바이더. orjson이 없으면 Flask 기본 동작 그대로.
+
+    한글을 \\uXXXX로 이스케이프하지 않아(UTF-8 그대로) 응답이 작고,
+    datetime/date는 기존 Flask 포맷과 같도록 default 핸들러로 넘긴다.
+    """
+
+    sort_keys = False
+    ensure_ascii = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(
+            obj,
+            default=self.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        ).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # 문자열 왕복 없이 bytes로 바로 응답 생성
+        if orjson is None or self._app.debug:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(
+            obj,
+            default=self.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def choose_encoding(accept_encodings):
+    """werkzeug Accept 객체에서 사용할 Content-Encoding 선택 (br > gzip)"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response, accept_encodings):
+    """조건을 만족하는 응답 본문을 압축. 스트리밍/이미 인코딩된/작은 응답은 건드리지 않음."""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESS_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -1,29 +1,116 @@
 import os
+import io
+import re
+import secrets
+import tempfile
+import string
+import csv
+import json
 import time
+import threading
+import importlib
+import functools
+import hashlib
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta, timezone
 from calendar import monthrange
-from flask import Flask, render_template, request, jsonify, send_from_directory
-from models import db, User, PushupRecord, StockHolding, CashAsset, SiteConfig, Event, EventParticipant
-from whitenoise import WhiteNoise
-import holidays
-import requests as http_requests
+import click
+from flask import (Flask, render_template, request, jsonify, send_from_directory, Response,
+                   stream_with_context, g)
+from models import (db, User, PushupRecord, StockHolding, CashAsset, SiteConfig, Event,
+                    EventParticipant, PenaltyLedger, ChallengeGroup, GroupMember, ChangeLog,
+                    RecordArchive, MonthCompletion, WeekdayCompletion, MarketCacheEntry, RequestProfile,
+                    SlowQuery)
+from sqlalchemy.exc import IntegrityError
+try:
+    import fcntl
+except ImportError:  # Windows 로컬 개발: 워커 간 단일 빌드 잠금 없이 동작
+    fcntl = None
+from api_encoding import FastJSONProvider, compress_response
+from rate_limit import SharedTokenBucket
+from warm_cache import WarmCache
+from symbols import (SymbolEntry, SymbolIndex, read_symbols, write_symbols, parse_kind_listing,
+                     parse_nasdaq_directory, KIND_LIST_URL, NASDAQ_LISTED_URL, OTHER_LISTED_URL)
+import profiling
+
+
+class _LazyModule:
+    """첫 속성 접근 때 import하는 모듈 프록시 (워커 기동 시 무거운 import 지연)"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+http_requests = _LazyModule('requests')
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 # 정적 파일 서빙 (배포 환경)
-app.wsgi_app = WhiteNoise(app.wsgi_app, root='static/', prefix='static/')
+# static/dist/의 콘텐츠 해시 번들(scripts/build_assets.py 결과)은 1년 immutable 캐시
+_HASHED_ASSET_RE = re.compile(r'^/static/dist/.+\.[0-9a-f]{10}\.(css|js)$')
+
+
+def _is_hashed_asset(path, url):
+    return bool(_HASHED_ASSET_RE.match(url))
+
+
+class _LazyWhiteNoise:
+    """첫 요청 때 WhiteNoise를 만들어 감싸는 WSGI 래퍼 (기동 시 static/ 스캔 지연)"""
+
+    def __init__(self, wsgi_app, **kwargs):
+        self._wsgi_app = wsgi_app
+        self._kwargs = kwargs
+        self._app = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    from whitenoise import WhiteNoise
+                    self._app = WhiteNoise(self._wsgi_app, **self._kwargs)
+        return self._app
+
+    def __call__(self, environ, start_response):
+        return self.load()(environ, start_response)
+
+
+app.wsgi_app = _LazyWhiteNoise(app.wsgi_app, root='static/', prefix='static/',
+                               immutable_file_test=_is_hashed_asset)
 
 # 설정
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 
-# DATABASE_URL 처리 (Render/Supabase 호환성)
-database_url = os.environ.get('DATABASE_URL', 'sqlite:///pushups.db')
-# Render는 postgres://를 사용하지만 SQLAlchemy + psycopg3는 postgresql+psycopg://를 요구
-if database_url.startswith('postgres://'):
-    database_url = database_url.replace('postgres://', 'postgresql+psycopg://', 1)
-elif database_url.startswith('postgresql://'):
-    database_url = database_url.replace('postgresql://', 'postgresql+psycopg://', 1)
+
+def normalize_database_url(url):
+    """DATABASE_URL 처리 (Render/Supabase 호환성)
+    Render는 postgres://를 사용하지만 SQLAlchemy + psycopg3는 postgresql+psycopg://를 요구
+    """
+    if url.startswith('postgres://'):
+        return url.replace('postgres://', 'postgresql+psycopg://', 1)
+    if url.startswith('postgresql://'):
+        return url.replace('postgresql://', 'postgresql+psycopg://', 1)
+    return url
+
+
+database_url = normalize_database_url(os.environ.get('DATABASE_URL', 'sqlite:///pushups.db'))
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+
+# 읽기 전용 replica (선택). 설정하면 @read_replica 조회 API가 이 엔진을 사용.
+replica_url = os.environ.get('DATABASE_REPLICA_URL', '').strip()
+if replica_url:
+    app.config['SQLALCHEMY_BINDS'] = {'replica': normalize_database_url(replica_url)}
+# 쓰기 직후 이 시간(초) 동안은 같은 클라이언트의 조회도 primary로 (read-your-writes)
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', '10'))
+REPLICA_PIN_COOKIE = 'db_pin'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
     'pool_pre_ping': True,
@@ -42,21 +129,101 @@ def today_kst():
     return datetime.now(KST).date()
 
 
-# 한국 공휴일
-kr_holidays = holidays.KR()
+# 한국 공휴일 (holidays 패키지 import + 테이블 생성은 첫 사용 시)
+_kr_holidays = None
+
+
+def get_kr_holidays():
+    global _kr_holidays
+    if _kr_holidays is None:
+        import holidays
+        _kr_holidays = holidays.KR()
+    return _kr_holidays
+
+
+# 거래소 정규장 (현지 시각). 시세 캐시 TTL과 자산 캐시 세대를 이 달력에 맞춘다.
+MARKET_SESSIONS = {'KR': ((9, 0), (15, 30)), 'US': ((9, 30), (16, 0))}
+MARKET_SETTLE_SECONDS = 30 * 60  # 마감 후에도 지연 시세·종가 확정 반영까지는 장중처럼 짧은 TTL
+KRX_EXTRA_CLOSED = ((5, 1), (12, 31))  # 공휴일 외 KRX 휴장일: 근로자의 날, 연말 휴장
+_nyse_holidays = None
+_us_market_tz = None
+
+
+def get_nyse_holidays():
+    global _nyse_holidays
+    if _nyse_holidays is None:
+        import holidays
+        _nyse_holidays = holidays.NYSE()
+    return _nyse_holidays
+
+
+def market_timezone(market):
+    global _us_market_tz
+    if market == 'KR':
+        return KST
+    if _us_market_tz is None:
+        from zoneinfo import ZoneInfo
+        _us_market_tz = ZoneInfo('America/New_York')  # 서머타임 반영
+    return _us_market_tz
+
+
+def is_market_day(market, d):
+    if d.weekday() >= 5:
+        return False
+    if market == 'KR':
+        return d not in get_kr_holidays() and (d.month, d.day) not in KRX_EXTRA_CLOSED
+    return d not in get_nyse_holidays()
+
+
+def market_session(market, d):
+    """d일 정규장 (개장, 마감) aware datetime"""
+    tz = market_timezone(market)
+    (oh, om), (ch, cm) = MARKET_SESSIONS[market]
+    return (datetime(d.year, d.month, d.day, oh, om, tzinfo=tz),
+            datetime(d.year, d.month, d.day, ch, cm, tzinfo=tz))
+
+
+def is_market_live(market, now):
+    """장중이거나 마감 직후 정리 구간인지 (now: aware datetime)"""
+    d = now.astimezone(market_timezone(market)).date()
+    if not is_market_day(market, d):
+        return False
+    open_at, close_at = market_session(market, d)
+    return open_at <= now < close_at + timedelta(seconds=MARKET_SETTLE_SECONDS)
 
-# 관리자 목록
-ADMIN_USERS = ["원석준", "김병석"]
+
+def next_market_open(market, now):
+    """now 이후 첫 개장 시각 (연휴를 건너뜀)"""
+    d = now.astimezone(market_timezone(market)).date()
+    for offset in range(20):
+        day = d + timedelta(days=offset)
+        if is_market_day(market, day):
+            open_at = market_session(market, day)[0]
+            if open_at > now:
+                return open_at
+    return now + timedelta(days=1)
+
+# 사이트 관리자 목록 (그룹 관리자는 GroupMember.role로 별도 관리)
+ADMIN_USERS = [n.strip() for n in os.environ.get('ADMIN_USERS', '원석준,김병석').split(',') if n.strip()]
 
 # Finnhub API 설정 (환경변수는 폴백용)
 FINNHUB_API_KEY_ENV = os.environ.get('FINNHUB_API_KEY', '')
 
 
+# 해외 거래소 심볼 (Yahoo 표기): 7203.T(도쿄), 0700.HK(홍콩), SAP.DE(독일) 등
+INTL_SYMBOL_RE = re.compile(r'^[A-Z0-9-]{1,10}\.[A-Z]{1,3}$')
+
+# 시장별 기본 통화 (INTL은 시세 응답의 통화 사용)
+MARKET_CURRENCY = {'KR': 'KRW', 'US': 'USD'}
+
+
 def detect_market(symbol):
-    """종목 심볼로 시장 구분. 6자리 숫자 = KOSPI/KOSDAQ(KR), 그 외 = NASDAQ(US)."""
+    """종목 심볼로 시장 구분. 6자리 숫자 = KOSPI/KOSDAQ(KR), 접미사 있는 해외 심볼 = INTL, 그 외 = NASDAQ(US)."""
     s = (symbol or '').strip()
     if s.isdigit() and len(s) == 6:
         return 'KR'
+    if INTL_SYMBOL_RE.match(s.upper()):
+        return 'INTL'
     return 'US'
 
 
@@ -78,7 +245,7 @@ def get_finnhub_api_key():
         pass
     return FINNHUB_API_KEY_ENV
 
-# 주가 캐시 (60초 TTL)
+# 주가 캐시 {심볼: (조회 시각, 시세, 만료 시각)}. 장중 60초, 장이 닫혀 있으면 다음 개장까지.
 _price_cache = {}
 PRICE_CACHE_TTL = 60
 
@@ -87,18 +254,229 @@ PRICE_CACHE_TTL = 60
 _name_cache = {}
 NAME_CACHE_TTL = 6 * 3600
 
+# 영구 캐시 계층: 위 메모리 캐시(+환율)를 DB market_cache 테이블에 write-through 해 두고 프로세스 시작 시 다시 채움.
+# 재시작(배포·스핀다운 후 기동) 직후 DB에서 올라온 값은 만료됐어도 바로 반환하고 백그라운드에서 갱신한다.
+# 워커끼리도 공유되어, 메모리 캐시가 만료되면 업스트림 전에 다른 워커가 방금 받은 값을 먼저 확인.
+# 기록은 요청 경로에서 DB 왕복을 기다리지 않도록 백그라운드 풀에서.
+warm_cache = WarmCache(MarketCacheEntry.__table__, lambda: db.engine)
+_warm_cache_state = {'loaded': False, 'pid': None, 'pool': None}
+_warm_keys = set()  # 영구 캐시에서 올라와 아직 새로 받지 않은 (종류, 키)
+_warm_refreshing = set()
+_warm_lock = threading.Lock()
+WARM_REFRESH_WORKERS = 4
+
+
+def load_warm_cache():
+    """영구 캐시를 메모리 캐시로 한 번 읽어 들임 (gunicorn 마스터 warm_up 또는 워커의 첫 조회)"""
+    if _warm_cache_state['loaded']:
+        return
+    with _warm_lock:
+        if _warm_cache_state['loaded']:
+            return
+        stored = warm_cache.load_all()
+        for symbol, (fetched_at, data, expires_at) in stored.get('price', {}).items():
+            if symbol not in _price_cache:
+                _price_cache[symbol] = (fetched_at, data, expires_at or fetched_at + PRICE_CACHE_TTL)
+                _warm_keys.add(('price', symbol))
+        for symbol, (fetched_at, name, _) in stored.get('name', {}).items():
+            if symbol not in _name_cache:
+                _name_cache[symbol] = (fetched_at, name)
+                _warm_keys.add(('name', symbol))
+        fx = stored.get('fx', {}).get('USD')
+        if fx and not _fx_cache['rates']:
+            _fx_cache['time'], _fx_cache['rates'] = fx[0], fx[1]
+            _warm_keys.add(('fx', 'USD'))
+        _warm_cache_state['loaded'] = True
+
+
+def _take_warm_key(kind, key):
+    """영구 캐시에서 올라온 값이면 True (한 번만 — 이후 만료는 평소처럼 동기 갱신)"""
+    with _warm_lock:
+        if (kind, key) in _warm_keys:
+            _warm_keys.discard((kind, key))
+            return True
+        return False
+
+
+def _warm_pool():
+    """백그라운드 갱신·기록용 스레드 풀 (호출부가 _warm_lock 보유)"""
+    if _warm_cache_state['pid'] != os.getpid():  # fork 후 워커마다 풀 새로 생성
+        _warm_cache_state['pid'] = os.getpid()
+        _warm_cache_state['pool'] = ThreadPoolExecutor(WARM_REFRESH_WORKERS, thread_name_prefix='warm-refresh')
+    return _warm_cache_state['pool']
+
+
+def persist_warm_cache(kind, key, fetched_at, value, expires_at=None):
+    """영구 캐시에 기록 (백그라운드)"""
+    def run():
+        with app.app_context():
+            warm_cache.put(kind, key, fetched_at, value, expires_at)
+
+    with _warm_lock:
+        pool = _warm_pool()
+    pool.submit(run)
+
+
+def refresh_in_background(kind, key, fetch, *args):
+    """만료된 값을 반환한 뒤 백그라운드에서 새로 받음. 같은 키는 한 번에 하나만."""
+    with _warm_lock:
+        if (kind, key) in _warm_refreshing:
+            return
+        _warm_refreshing.add((kind, key))
+        pool = _warm_pool()
+
+    def run():
+        try:
+            with app.app_context():
+                fetch(*args)
+        except Exception as e:
+            app.logger.warning('백그라운드 갱신 실패 (%s %s): %s', kind, key, e)
+        finally:
+            with _warm_lock:
+                _warm_refreshing.discard((kind, key))
+
+    pool.submit(run)
+
+
+def clear_price_cache():
+    """시세 캐시 초기화 (메모리 + 영구 캐시). API 키 변경 시."""
+    _price_cache.clear()
+    warm_cache.clear('price')
+    with _warm_lock:
+        _warm_keys.difference_update({k for k in _warm_keys if k[0] == 'price'})
+
+# 외부 API 요청 공통 헤더
+_UA_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; 100-challenge/1.0)'}
+
+
+class CircuitBreaker:
+    """업스트림 제공자별 서킷 브레이커.
+
+    closed: 정상 호출. 연속 실패가 failure_threshold에 도달하면 open.
+    open: reset_timeout 동안 호출 없이 즉시 실패 → 호출부는 캐시된 마지막 값으로 폴백.
+    half_open: reset_timeout 경과 후 프로브 요청 1건만 통과. 성공 시 closed, 실패 시 다시 open.
+    """
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0
+        self.state = 'closed'
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """이번 호출을 업스트림으로 보내도 되는지 여부"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                if time.time() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = 'half_open'
+            # half_open: 동시에 프로브 1건만 허용
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = 'closed'
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.time()
+
+    def release(self):
+        """호출을 보내지 않고 포기했을 때 (호출 예산 부족) 프로브 자리만 반납"""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+_http_session = {'pid': None, 'session': None}
+
+
+def get_http_session():
+    """업스트림 호출용 requests.Session (keep-alive 재사용). 프로세스(워커)별로 첫 사용 시 생성."""
+    pid = os.getpid()
+    if _http_session['pid'] != pid:
+        _http_session['session'] = http_requests.Session()
+        _http_session['pid'] = pid
+    return _http_session['session']
+
+
+_breakers = {
+    'yahoo': CircuitBreaker('yahoo'),
+    'naver': CircuitBreaker('naver'),
+    'finnhub': CircuitBreaker('finnhub'),
+    'er-api': CircuitBreaker('er-api'),
+}
+
+
+# 호출 예산이 있는 제공자: 워커 간 공유 토큰 버킷 (Finnhub 무료 플랜 분당 60회)
+# 우선순위: held(보유 종목 시세 갱신) > page(자산 페이지 종목명, 관리자 화면) > adhoc(공개 시세 프록시)
+# build는 held와 같은 몫이지만 기다리지 않음: 자산 빌드는 워커 간 파일 잠금을 쥔 채 종목을 순서대로 조회하므로,
+# 토큰이 없으면 대기 대신 캐시된 시세로 만들고 (stale 표시) 다음 세대에 다시 시도한다.
+PRIORITY_HELD, PRIORITY_BUILD, PRIORITY_PAGE, PRIORITY_ADHOC = 'held', 'build', 'page', 'adhoc'
+RATE_LIMIT_DB = os.environ.get('RATE_LIMIT_DB') or os.path.join(tempfile.gettempdir(), 'pushups-rate-limit.sqlite3')
+FINNHUB_RATE_PER_MIN = float(os.environ.get('FINNHUB_RATE_PER_MIN', '55'))
+_rate_limiters = {
+    'finnhub': SharedTokenBucket(
+        RATE_LIMIT_DB, 'finnhub', FINNHUB_RATE_PER_MIN, capacity=20,
+        floors={PRIORITY_HELD: 0, PRIORITY_BUILD: 0, PRIORITY_PAGE: 4, PRIORITY_ADHOC: 10},
+        max_waits={PRIORITY_HELD: 3.0, PRIORITY_BUILD: 0.0, PRIORITY_PAGE: 1.0, PRIORITY_ADHOC: 0.0},
+    ),
+}
+
+
+def _provider_get(provider, url, priority=PRIORITY_PAGE, **kwargs):
+    """서킷 브레이커(+ 호출 예산)를 거쳐 외부 API GET 요청.
+
+    브레이커가 열려 있거나, 예산이 모자라 대기 한도 안에 토큰을 못 얻었거나, 요청이 실패하면 None을 반환한다
+    (호출부는 캐시된 마지막 값으로 폴백 → 다음 갱신으로 미뤄짐).
+    타임아웃/연결 오류/5xx/429만 제공자 장애로 집계하고, 404 같은 종목 단위 응답은 정상으로 본다.
+    """
+    breaker = _breakers[provider]
+    if not breaker.allow():
+        return None
+    limiter = _rate_limiters.get(provider)
+    if limiter and not limiter.acquire(priority):
+        breaker.release()
+        return None
+    kwargs.setdefault('timeout', 5)
+    try:
+        resp = get_http_session().get(url, **kwargs)
+    except Exception:
+        breaker.record_failure()
+        return None
+    if resp.status_code == 429 and limiter:
+        limiter.drain()
+    if resp.status_code >= 500 or resp.status_code == 429:
+        breaker.record_failure()
+        return None
+    breaker.record_success()
+    return resp
+
 
 def _fetch_kr_stock_name(symbol):
     """한국 종목명 조회. 네이버 증권 모바일 API 우선, Yahoo 폴백."""
-    headers = {'User-Agent': 'Mozilla/5.0 (compatible; 100-challenge/1.0)'}
     # 1) 네이버 증권 m.stock API (한글명 제공)
+    resp = _provider_get(
+        'naver',
+        f'https://m.stock.naver.com/api/stock/{symbol}/basic',
+        headers=_UA_HEADERS,
+    )
     try:
-        resp = http_requests.get(
-            f'https://m.stock.naver.com/api/stock/{symbol}/basic',
-            headers=headers,
-            timeout=5,
-        )
-        if resp.status_code == 200:
+        if resp is not None and resp.status_code == 200:
             data = resp.json() or {}
             nm = data.get('stockName') or data.get('name')
             if nm:
@@ -107,13 +485,15 @@ def _fetch_kr_stock_name(symbol):
         pass
     # 2) 폴백: Yahoo Finance shortName (영문)
     for suffix in ('.KS', '.KQ'):
+        resp = _provider_get(
+            'yahoo',
+            f'https://query1.finance.yahoo.com/v8/finance/chart/{symbol}{suffix}',
+            params={'interval': '1d', 'range': '2d'},
+            headers=_UA_HEADERS,
+        )
+        if resp is None:
+            break  # 브레이커 open 또는 장애 — 다음 접미사도 같은 제공자이므로 중단
         try:
-            resp = http_requests.get(
-                f'https://query1.finance.yahoo.com/v8/finance/chart/{symbol}{suffix}',
-                params={'interval': '1d', 'range': '2d'},
-                headers=headers,
-                timeout=5,
-            )
             if resp.status_code != 200:
                 continue
             data = resp.json()
@@ -129,18 +509,19 @@ def _fetch_kr_stock_name(symbol):
     return None
 
 
-def _fetch_us_stock_name(symbol):
+def _fetch_us_stock_name(symbol, priority=PRIORITY_PAGE):
     """Finnhub profile2로 미국 종목명 조회."""
     api_key = get_finnhub_api_key()
     if not api_key:
         return None
+    resp = _provider_get(
+        'finnhub',
+        'https://finnhub.io/api/v1/stock/profile2',
+        params={'symbol': symbol, 'token': api_key},
+        priority=priority,
+    )
     try:
-        resp = http_requests.get(
-            'https://finnhub.io/api/v1/stock/profile2',
-            params={'symbol': symbol, 'token': api_key},
-            timeout=5,
-        )
-        if resp.status_code == 200:
+        if resp is not None and resp.status_code == 200:
             data = resp.json() or {}
             nm = data.get('name')
             if nm:
@@ -148,58 +529,141 @@ def _fetch_us_stock_name(symbol):
     except Exception:
         pass
     # Finnhub 없을 때 Yahoo로 폴백
-    headers = {'User-Agent': 'Mozilla/5.0 (compatible; 100-challenge/1.0)'}
+    return _fetch_yahoo_stock_name(symbol)
+
+
+def _fetch_yahoo_chart_meta(yahoo_symbol):
+    """Yahoo chart 엔드포인트의 meta (없거나 실패하면 None)"""
+    resp = _provider_get(
+        'yahoo',
+        f'https://query1.finance.yahoo.com/v8/finance/chart/{yahoo_symbol}',
+        params={'interval': '1d', 'range': '2d'},
+        headers=_UA_HEADERS,
+    )
     try:
-        resp = http_requests.get(
-            f'https://query1.finance.yahoo.com/v8/finance/chart/{symbol}',
-            params={'interval': '1d', 'range': '2d'},
-            headers=headers,
-            timeout=5,
-        )
-        if resp.status_code == 200:
+        if resp is not None and resp.status_code == 200:
             data = resp.json()
             results = (data or {}).get('chart', {}).get('result') or []
             if results:
-                meta = results[0].get('meta', {}) or {}
-                nm = meta.get('shortName') or meta.get('longName')
-                if nm:
-                    return nm.strip()
+                return results[0].get('meta', {}) or {}
     except Exception:
         pass
     return None
 
 
-def get_stock_name(symbol):
-    """종목명 조회. 캐시 포함."""
+def _fetch_yahoo_stock_name(yahoo_symbol):
+    """Yahoo shortName/longName으로 종목명 조회 (미국 폴백, 해외 종목)"""
+    meta = _fetch_yahoo_chart_meta(yahoo_symbol)
+    if meta:
+        nm = meta.get('shortName') or meta.get('longName')
+        if nm:
+            return nm.strip()
+    return None
+
+
+def _fetch_intl_stock_price(symbol):
+    """해외 거래소 종목 시세 (Yahoo). 통화는 응답 meta.currency를 함께 반환."""
+    meta = _fetch_yahoo_chart_meta(symbol)
+    if not meta:
+        return None
+    price = meta.get('regularMarketPrice')
+    prev = meta.get('chartPreviousClose') or meta.get('previousClose')
+    currency = (meta.get('currency') or '').strip()
+    if not price or not currency:
+        return None
+    price = float(price)
+    prev = float(prev) if prev else price
+    if currency == 'GBp':  # 런던 거래소는 펜스 단위 호가
+        price, prev, currency = price / 100, prev / 100, 'GBP'
+    change = price - prev
+    dp = (change / prev * 100) if prev else 0
+    return {'c': price, 'dp': dp, 'd': change, 'pc': prev, 'currency': currency.upper()}
+
+
+# 종목 마스터 (data/symbols.csv): 자동완성 + 오프라인 우선 종목명.
+# 첫 사용 시 로드하고, 파일이 바뀌면 (flask refresh-symbols) 최대 1분 안에 다시 읽는다.
+SYMBOLS_FILE = os.environ.get('SYMBOLS_FILE') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'data', 'symbols.csv')
+SYMBOLS_RELOAD_CHECK = 60
+_symbol_index = {'index': None, 'mtime': None, 'checked_at': 0.0}
+_symbol_index_lock = threading.Lock()
+
+
+def get_symbol_index():
+    now = time.monotonic()
+    if _symbol_index['index'] is not None and now - _symbol_index['checked_at'] < SYMBOLS_RELOAD_CHECK:
+        return _symbol_index['index']
+    with _symbol_index_lock:
+        try:
+            mtime = os.path.getmtime(SYMBOLS_FILE)
+        except OSError:
+            mtime = None
+        if _symbol_index['index'] is None or mtime != _symbol_index['mtime']:
+            try:
+                entries = read_symbols(SYMBOLS_FILE) if mtime is not None else []
+            except (OSError, ValueError) as e:
+                app.logger.warning('종목 마스터 로드 실패: %s', e)
+                entries = []
+            _symbol_index.update(index=SymbolIndex(entries), mtime=mtime)
+        _symbol_index['checked_at'] = now
+    return _symbol_index['index']
+
+
+def get_stock_name(symbol, priority=PRIORITY_PAGE):
+    """종목명 조회. 종목 마스터 → 캐시 → 외부 API 순. priority는 Finnhub 호출 예산 우선순위."""
     now = time.time()
+    entry = get_symbol_index().lookup(symbol)
+    if entry:
+        return entry.name
+    load_warm_cache()
     if symbol in _name_cache:
         cached_time, cached_name = _name_cache[symbol]
         if now - cached_time < NAME_CACHE_TTL:
             return cached_name
+        if _take_warm_key('name', symbol):
+            refresh_in_background('name', symbol, fetch_stock_name, symbol, priority)
+            return cached_name
+    return fetch_stock_name(symbol, priority)
+
+
+def fetch_stock_name(symbol, priority=PRIORITY_PAGE):
+    """종목명 외부 조회 (영구 캐시에 다른 워커가 받은 값이 있으면 그것부터)"""
+    now = time.time()
+    shared = warm_cache.get('name', symbol)
+    if shared and now - shared[0] < NAME_CACHE_TTL:
+        _name_cache[symbol] = (shared[0], shared[1])
+        return shared[1]
 
-    if detect_market(symbol) == 'KR':
+    market = detect_market(symbol)
+    if market == 'KR':
         name = _fetch_kr_stock_name(symbol)
+    elif market == 'INTL':
+        name = _fetch_yahoo_stock_name(symbol)
     else:
-        name = _fetch_us_stock_name(symbol)
+        name = _fetch_us_stock_name(symbol, priority)
 
     if name:
         _name_cache[symbol] = (now, name)
-    return name
+        persist_warm_cache('name', symbol, now, name)
+        return name
+    # 조회 실패 시 만료된 캐시라도 반환 (stale-on-error)
+    return _name_cache.get(symbol, (0, None))[1]
 
 
 def get_kr_stock_price(symbol):
     """한국 주식(KOSPI/KOSDAQ) 실시간 시세 조회.
     Yahoo Finance의 무료 chart 엔드포인트 사용. 종목코드 뒤에 .KS(KOSPI) → .KQ(KOSDAQ) 순으로 시도.
     """
-    headers = {'User-Agent': 'Mozilla/5.0 (compatible; 100-challenge/1.0)'}
     for suffix in ('.KS', '.KQ'):
+        resp = _provider_get(
+            'yahoo',
+            f'https://query1.finance.yahoo.com/v8/finance/chart/{symbol}{suffix}',
+            params={'interval': '1d', 'range': '2d'},
+            headers=_UA_HEADERS,
+        )
+        if resp is None:
+            break  # 브레이커 open 또는 장애 — .KQ 재시도로 5초를 더 쓰지 않음
         try:
-            resp = http_requests.get(
-                f'https://query1.finance.yahoo.com/v8/finance/chart/{symbol}{suffix}',
-                params={'interval': '1d', 'range': '2d'},
-                headers=headers,
-                timeout=5,
-            )
             if resp.status_code != 200:
                 continue
             data = resp.json()
@@ -221,75 +685,160 @@ def get_kr_stock_price(symbol):
     return None
 
 
-def get_stock_price(symbol):
-    """주가 조회 (캐시 포함). KR 주식은 Yahoo Finance, US는 Finnhub."""
-    now = time.time()
-    if symbol in _price_cache:
-        cached_time, cached_data = _price_cache[symbol]
-        if now - cached_time < PRICE_CACHE_TTL:
-            return cached_data
-
-    if detect_market(symbol) == 'KR':
-        result = get_kr_stock_price(symbol)
-        if result:
-            _price_cache[symbol] = (now, result)
-        return result
-
+def _fetch_us_stock_price(symbol, priority=PRIORITY_PAGE):
+    """Finnhub quote로 미국 주식 시세 조회."""
     api_key = get_finnhub_api_key()
     if not api_key:
         return None
 
+    resp = _provider_get(
+        'finnhub',
+        'https://finnhub.io/api/v1/quote',
+        params={'symbol': symbol, 'token': api_key},
+        priority=priority,
+    )
     try:
-        resp = http_requests.get(
-            f'https://finnhub.io/api/v1/quote',
-            params={'symbol': symbol, 'token': api_key},
-            timeout=5
-        )
-        if resp.status_code == 200:
+        if resp is not None and resp.status_code == 200:
             data = resp.json()
-            result = {
+            return {
                 'c': data.get('c', 0),    # 현재가
                 'dp': data.get('dp', 0),   # 변동률%
                 'd': data.get('d', 0),     # 변동액
                 'pc': data.get('pc', 0),   # 전일 종가
             }
-            _price_cache[symbol] = (now, result)
-            return result
     except Exception:
         pass
+    return None
+
+
+def get_stock_price(symbol, priority=PRIORITY_PAGE):
+    """주가 조회 (캐시 포함). KR 주식은 Yahoo Finance, US는 Finnhub.
+    조회 실패(브레이커 open, 호출 예산 부족 포함) 시 마지막으로 성공한 값을 반환한다.
+    재시작 직후 영구 캐시에서 올라온 값은 만료됐어도 바로 반환하고 백그라운드에서 갱신한다.
+    """
+    load_warm_cache()
+    if symbol in _price_cache:
+        cached_time, cached_data, expires_at = _price_cache[symbol]
+        if time.time() < expires_at:
+            return cached_data
+        if _take_warm_key('price', symbol):
+            refresh_in_background('price', symbol, fetch_stock_price, symbol, PRIORITY_HELD)
+            return cached_data
+    return fetch_stock_price(symbol, priority)
+
+
+def fetch_stock_price(symbol, priority=PRIORITY_PAGE):
+    """시세 외부 조회 (영구 캐시에 다른 워커가 받은 유효한 값이 있으면 그것부터)"""
+    now = time.time()
+    shared = warm_cache.get('price', symbol)
+    if shared and shared[2] and now < shared[2]:
+        _price_cache[symbol] = shared
+        return shared[1]
+
+    market = detect_market(symbol)
+    if market == 'KR':
+        result = get_kr_stock_price(symbol)
+    elif market == 'INTL':
+        result = _fetch_intl_stock_price(symbol)
+    else:
+        result = _fetch_us_stock_price(symbol, priority)
+
+    if result:
+        expires_at = quote_expires_at(symbol, now)
+        _price_cache[symbol] = (now, result, expires_at)
+        persist_warm_cache('price', symbol, now, result, expires_at)
+        return result
+    return _price_cache.get(symbol, (0, None, 0))[1]
+
+
+def quote_expires_at(symbol, fetched_at):
+    """시세 캐시 만료 시각: 장중이면 PRICE_CACHE_TTL 뒤, 닫혀 있으면 다음 개장.
+    해외(INTL) 거래소는 달력이 없어 항상 PRICE_CACHE_TTL."""
+    market = detect_market(symbol)
+    if market not in MARKET_SESSIONS:
+        return fetched_at + PRICE_CACHE_TTL
+    now = datetime.fromtimestamp(fetched_at, timezone.utc)
+    if is_market_live(market, now):
+        return fetched_at + PRICE_CACHE_TTL
+    return next_market_open(market, now).timestamp()
 
-    return _price_cache.get(symbol, (0, None))[1]
+
+def is_price_stale(symbol):
+    """캐시된 시세가 만료된 상태(업스트림 장애로 마지막 값 재사용 중)인지 여부. 휴장 중 종가는 stale 아님."""
+    cached = _price_cache.get(symbol)
+    if not cached:
+        return False
+    return time.time() >= cached[2]
 
 
-# 환율 캐시 (5분 TTL)
-_exchange_rate_cache = {'time': 0, 'rate': 0}
+# 환율 캐시 (5분 TTL) — open.er-api의 USD 기준 전체 환율표를 한 번에 보관하고 교차환율은 로컬 계산
+_fx_cache = {'time': 0, 'rates': {}}
 EXCHANGE_RATE_CACHE_TTL = 300
+FX_FALLBACK_RATES = {'USD': 1.0, 'KRW': 1350}  # 한 번도 조회 못 했을 때의 폴백
 
 
-def get_usd_krw_rate():
-    """USD/KRW 환율 조회 (캐시 포함)"""
+def get_fx_rates():
+    """USD 기준 환율표 {통화: 1 USD당 금액} (캐시 포함). 통화가 늘어도 업스트림 호출은 1회."""
+    load_warm_cache()
+    if _fx_cache['rates']:
+        if time.time() - _fx_cache['time'] < EXCHANGE_RATE_CACHE_TTL:
+            return _fx_cache['rates']
+        if _take_warm_key('fx', 'USD'):
+            refresh_in_background('fx', 'USD', fetch_fx_rates)
+            return _fx_cache['rates']
+    return fetch_fx_rates()
+
+
+def fetch_fx_rates():
+    """환율표 외부 조회 (영구 캐시에 다른 워커가 받은 유효한 값이 있으면 그것부터)"""
     now = time.time()
-    if _exchange_rate_cache['rate'] and now - _exchange_rate_cache['time'] < EXCHANGE_RATE_CACHE_TTL:
-        return _exchange_rate_cache['rate']
+    shared = warm_cache.get('fx', 'USD')
+    if shared and now - shared[0] < EXCHANGE_RATE_CACHE_TTL:
+        _fx_cache['time'], _fx_cache['rates'] = shared[0], shared[1]
+        return shared[1]
 
+    resp = _provider_get('er-api', 'https://open.er-api.com/v6/latest/USD')
     try:
-        resp = http_requests.get(
-            'https://open.er-api.com/v6/latest/USD',
-            timeout=5
-        )
-        if resp.status_code == 200:
-            data = resp.json()
-            rate = data.get('rates', {}).get('KRW', 0)
-            if rate > 0:
-                _exchange_rate_cache['time'] = now
-                _exchange_rate_cache['rate'] = rate
-                return rate
+        if resp is not None and resp.status_code == 200:
+            rates = {
+                code.upper(): float(rate)
+                for code, rate in (resp.json().get('rates') or {}).items()
+                if isinstance(rate, (int, float)) and rate > 0
+            }
+            if rates.get('KRW'):
+                rates['USD'] = 1.0
+                _fx_cache['time'] = now
+                _fx_cache['rates'] = rates
+                persist_warm_cache('fx', 'USD', now, rates)
+                return rates
     except Exception:
         pass
 
-    if _exchange_rate_cache['rate']:
-        return _exchange_rate_cache['rate']
-    return 1350  # 폴백 기본값
+    return _fx_cache['rates'] or FX_FALLBACK_RATES
+
+
+def get_fx_rate(from_currency, to_currency, rates=None):
+    """교차환율: 1 from_currency = ? to_currency. 환율표에 없는 통화면 None."""
+    if from_currency == to_currency:
+        return 1.0
+    rates = rates or get_fx_rates()
+    src_rate = rates.get(from_currency)
+    dst_rate = rates.get(to_currency)
+    if not src_rate or not dst_rate:
+        return None
+    return dst_rate / src_rate
+
+
+def get_usd_krw_rate():
+    """USD/KRW 환율 조회 (캐시 포함)"""
+    return get_fx_rate('USD', 'KRW')
+
+
+def is_exchange_rate_stale():
+    """환율이 TTL을 넘긴 캐시값 또는 폴백 기본값인지 여부"""
+    if not _fx_cache['rates']:
+        return True
+    return time.time() - _fx_cache['time'] >= EXCHANGE_RATE_CACHE_TTL
 
 
 def is_admin(user_name):
@@ -297,13 +846,67 @@ def is_admin(user_name):
     return user_name in ADMIN_USERS
 
 
+def get_membership(group_id, user_id):
+    """그룹 멤버십 조회 (없으면 None)"""
+    if not group_id or not user_id:
+        return None
+    return GroupMember.query.filter_by(group_id=group_id, user_id=user_id).first()
+
+
+def is_group_admin(user, group_id):
+    """그룹 관리자 여부 (사이트 관리자는 모든 그룹 관리 가능)"""
+    if not user:
+        return False
+    if is_admin(user.name):
+        return True
+    membership = get_membership(group_id, user.id)
+    return membership is not None and membership.role == 'admin'
+
+
+def can_view_group(group_id, user_id):
+    """그룹 멤버 또는 사이트 관리자만 그룹 단위 조회 가능"""
+    user = db.session.get(User, user_id) if user_id else None
+    return user is not None and (get_membership(group_id, user.id) is not None or is_admin(user.name))
+
+
+def hand_over_groups(user_id):
+    """삭제되는 유저의 그룹 정리: 만든 그룹은 남은 관리자에게 넘기고, 관리자가 없어지는 그룹은
+    가장 먼저 가입한 멤버를 관리자로 올림. 남은 멤버가 없는 그룹은 삭제. 커밋은 호출부에 맡긴다.
+    """
+    group_ids = {gid for (gid,) in db.session.query(GroupMember.group_id).filter_by(user_id=user_id)}
+    group_ids |= {gid for (gid,) in db.session.query(ChallengeGroup.id).filter_by(created_by=user_id)}
+    for group in ChallengeGroup.query.filter(ChallengeGroup.id.in_(group_ids)):
+        others = GroupMember.query.filter(
+            GroupMember.group_id == group.id, GroupMember.user_id != user_id
+        ).order_by(GroupMember.joined_at, GroupMember.id).all()
+        if not others:
+            db.session.delete(group)  # 멤버십은 cascade로 함께 삭제
+            continue
+        admins = [m for m in others if m.role == 'admin']
+        if not admins:
+            others[0].role = 'admin'
+            admins = [others[0]]
+        if group.created_by == user_id:
+            group.created_by = admins[0].user_id
+    db.session.flush()
+
+
+def get_scope_users(group_id=None):
+    """랭킹/벌금 집계 대상 유저. group_id가 있으면 그 그룹 멤버만 (group_members 인덱스로 조회)."""
+    if not group_id:
+        return User.query.all()
+    return User.query.join(GroupMember, GroupMember.user_id == User.id).filter(
+        GroupMember.group_id == group_id
+    ).all()
+
+
 def is_workday(check_date):
     """평일인지 확인 (주말과 공휴일 제외)"""
     # 주말 체크 (토요일=5, 일요일=6)
     if check_date.weekday() >= 5:
         return False
     # 공휴일 체크
-    if check_date in kr_holidays:
+    if check_date in get_kr_holidays():
         return False
     return True
 
@@ -324,34 +927,567 @@ def get_month_workdays(year, month):
     return workdays
 
 
-def calculate_penalty(user_id, year, month):
-    """벌금 계산 (미체크 평일 * 10000원)"""
-    workdays = get_month_workdays(year, month)
+def next_workday(d):
+    """d 다음 평일"""
+    d += timedelta(days=1)
+    while not is_workday(d):
+        d += timedelta(days=1)
+    return d
+
+
+def previous_workday(d):
+    """d 이전 평일"""
+    d -= timedelta(days=1)
+    while not is_workday(d):
+        d -= timedelta(days=1)
+    return d
+
+
+# 연도별 기록 압축본 (마감된 연도의 pushup_records → record_archives)
+ARCHIVE_BITS_BYTES = 46  # 366일
+RECORD_DELETE_CHUNK = 500  # 대량 삭제는 이 크기씩 나눠 커밋 (잠금 시간 짧게)
+
+
+def is_archivable_year(year):
+    """압축본이 있을 수 있는 연도 (KST 기준 지난 해 이전). 이번 해 조회는 압축본 쿼리를 건너뜀."""
+    return year < today_kst().year
+
+
+def _day_index(d):
+    return d.timetuple().tm_yday - 1
+
+
+def _archive_mask(archive):
+    return int.from_bytes(archive.bits or b'', 'little')
+
+
+def archive_month_dates(archive, month):
+    """압축본에서 해당 월 완료 날짜 집합"""
+    mask = _archive_mask(archive)
+    start = date(archive.year, month, 1)
+    _, last_day = monthrange(archive.year, month)
+    base = _day_index(start)
+    return {start + timedelta(days=i) for i in range(last_day) if mask >> (base + i) & 1}
+
+
+def archive_all_dates(archive):
+    mask = _archive_mask(archive)
+    start = date(archive.year, 1, 1)
+    return {start + timedelta(days=i) for i in range(mask.bit_length()) if mask >> i & 1}
 
-    # 해당 월의 완료된 기록 조회
-    start_date = date(year, month, 1)
+
+def set_archive_bits(archive, days, completed=True):
+    """압축본 비트를 켜고/끄고 월별·연간 합계를 다시 계산"""
+    mask = _archive_mask(archive)
+    for d in days:
+        bit = 1 << _day_index(d)
+        mask = mask | bit if completed else mask & ~bit
+    archive.bits = mask.to_bytes(ARCHIVE_BITS_BYTES, 'little')
+    counts = []
+    for month in range(1, 13):
+        _, last_day = monthrange(archive.year, month)
+        counts.append((mask >> _day_index(date(archive.year, month, 1)) & ((1 << last_day) - 1)).bit_count())
+    archive.month_counts = json.dumps(counts)
+    archive.completed_days = sum(counts)
+
+
+def delete_records_in_chunks(*criteria, tombstones=False):
+    """조건에 맞는 체크 기록을 RECORD_DELETE_CHUNK씩 삭제하고 청크마다 커밋. 삭제한 행 수 반환.
+    tombstones=True면 동기화용 삭제 기록도 남김 (압축본으로 옮길 때는 데이터가 남으므로 False).
+    """
+    total = 0
+    while True:
+        rows = db.session.query(PushupRecord.id, PushupRecord.user_id, PushupRecord.date).filter(
+            *criteria
+        ).order_by(PushupRecord.id).limit(RECORD_DELETE_CHUNK).all()
+        if not rows:
+            return total
+        if tombstones:
+            for record_id, uid, record_date in rows:
+                log_change('record', uid, 'delete', user_id=uid, date=record_date)
+        PushupRecord.query.filter(PushupRecord.id.in_([r.id for r in rows])).delete(synchronize_session=False)
+        db.session.commit()
+        total += len(rows)
+
+
+def archive_closed_years(before_year=None):
+    """마감된 연도(기본: 올해 이전)의 기록을 유저×연도 압축본으로 옮기고 원본 행을 청크 삭제.
+    유저·연도 단위로 커밋하므로 중간에 멈춰도 다시 실행하면 이어서 처리된다 (압축본과 원본이 겹쳐도 조회는 합집합).
+    반환: [(year, user_id, 옮긴 행 수)]
+    """
+    before_year = before_year or today_kst().year
+    before_year = min(before_year, today_kst().year)
+    pairs = db.session.query(
+        PushupRecord.user_id, db.extract('year', PushupRecord.date).label('year')
+    ).filter(PushupRecord.date < date(before_year, 1, 1)).distinct().all()
+
+    archived = []
+    for uid, year in sorted(pairs, key=lambda p: (int(p.year), p.user_id)):
+        year = int(year)
+        start, end = date(year, 1, 1), date(year, 12, 31)
+        records = db.session.query(PushupRecord.date, PushupRecord.completed, PushupRecord.created_at).filter(
+            PushupRecord.user_id == uid, PushupRecord.date >= start, PushupRecord.date <= end
+        ).all()
+
+        archive = RecordArchive.query.filter_by(user_id=uid, year=year).first()
+        if archive is None:
+            archive = RecordArchive(user_id=uid, year=year, bits=b'')
+            db.session.add(archive)
+        set_archive_bits(archive, [d for d, completed, _ in records if completed])
+        first_checks = json.loads(archive.first_checks or '{}')
+        for d, _, created_at in records:
+            key = str(d.month)
+            if created_at and (key not in first_checks or created_at.isoformat() < first_checks[key]):
+                first_checks[key] = created_at.isoformat()
+        archive.first_checks = json.dumps(first_checks)
+        db.session.commit()
+
+        moved = delete_records_in_chunks(
+            PushupRecord.user_id == uid, PushupRecord.date >= start, PushupRecord.date <= end
+        )
+        archived.append((year, uid, moved))
+    return archived
+
+
+# 유저×월 완료 비트마스크 (month_completions) — 캘린더/벌금 계산은 원본 기록 대신 이 값을 읽음
+def month_mask_dates(year, month, mask):
+    """비트마스크 → 완료 날짜 목록"""
     _, last_day = monthrange(year, month)
-    end_date = date(year, month, last_day)
+    return [date(year, month, d + 1) for d in range(last_day) if mask >> d & 1]
+
+
+def get_workday_mask(year, month):
+    """해당 월 평일(오늘까지) 비트마스크"""
+    mask = 0
+    for d in get_month_workdays(year, month):
+        mask |= 1 << (d.day - 1)
+    return mask
+
+
+def ensure_month_completion(user_id, year, month):
+    """유저×월 비트마스크 행이 없으면 빈 행(mask=0)을 만듦. 커밋은 호출부 트랜잭션에 맡긴다."""
+    key = {'user_id': user_id, 'year': year, 'month': month}
+    if db.session.query(MonthCompletion.id).filter_by(**key).first() is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(MonthCompletion(mask=0, **key))
+        except IntegrityError:
+            pass  # 동시 요청이 먼저 만듦
+
+
+def update_month_completion(user_id, target_date, completed):
+    """토글 결과를 월 비트마스크에 반영. 동시 토글에도 비트가 유실되지 않도록 SQL에서 원자적으로 OR/AND.
+    커밋은 호출부 트랜잭션에 맡긴다.
+    """
+    key = {'user_id': user_id, 'year': target_date.year, 'month': target_date.month}
+    ensure_month_completion(**key)
+
+    bit = 1 << (target_date.day - 1)
+    query = MonthCompletion.query.filter_by(**key)
+    if completed:
+        query.update({
+            'mask': MonthCompletion.mask.op('|')(bit),
+            'first_check_at': db.func.coalesce(MonthCompletion.first_check_at, datetime.utcnow()),
+        }, synchronize_session=False)
+    else:
+        query.update({'mask': MonthCompletion.mask.op('&')(~bit)}, synchronize_session=False)
+        query.filter(MonthCompletion.mask == 0).update({'first_check_at': None}, synchronize_session=False)
+
+
+def rebuild_month_completions():
+    """원본 기록 + 연도 압축본으로 월 비트마스크 전체 재생성 (최초 마이그레이션/복구용)"""
+    MonthCompletion.query.delete(synchronize_session=False)
+    entries = {}  # (user_id, year, month) -> [mask, first_check_at]
+
+    def first_of(current, candidate):
+        return candidate if candidate and (current is None or candidate < current) else current
+
+    stmt = db.select(PushupRecord.user_id, PushupRecord.date, PushupRecord.completed, PushupRecord.created_at)
+    for uid, d, completed, created_at in db.session.execute(stmt.execution_options(yield_per=EXPORT_CHUNK_ROWS)):
+        entry = entries.setdefault((uid, d.year, d.month), [0, None])
+        if completed:
+            entry[0] |= 1 << (d.day - 1)
+        entry[1] = first_of(entry[1], created_at)
+    for archive in RecordArchive.query.all():
+        first_checks = json.loads(archive.first_checks or '{}')
+        for month in range(1, 13):
+            entry = entries.setdefault((archive.user_id, archive.year, month), [0, None])
+            for d in archive_month_dates(archive, month):
+                entry[0] |= 1 << (d.day - 1)
+            if first_checks.get(str(month)):
+                entry[1] = first_of(entry[1], datetime.fromisoformat(first_checks[str(month)]))
+
+    rows = [MonthCompletion(user_id=uid, year=y, month=m, mask=mask, first_check_at=first)
+            for (uid, y, m), (mask, first) in entries.items() if mask]
+    db.session.add_all(rows)
+    db.session.commit()
+    rebuild_weekday_completions()
+    return len(rows)
+
+
+# 유저×요일 완료 평일 수 (weekday_completions) — 분석 화면 요일별 히트맵
+WEEKDAY_LABELS = ['월', '화', '수', '목', '금']
+_weekday_mask_cache = {}  # (year, month) -> 요일별 평일 비트마스크 (마감된 달만 캐시)
+
+
+def get_weekday_workday_masks(year, month):
+    """해당 월 평일(오늘까지) 비트마스크를 요일(월~금)별로 나눈 5개"""
+    cached = _weekday_mask_cache.get((year, month))
+    if cached is not None:
+        return cached
+    masks = [0] * len(WEEKDAY_LABELS)
+    for d in get_month_workdays(year, month):
+        masks[d.weekday()] |= 1 << (d.day - 1)
+    if is_month_closed(year, month):
+        _weekday_mask_cache[(year, month)] = masks
+    return masks
+
+
+def update_weekday_completion(user_id, target_date, completed):
+    """토글 결과를 요일 카운터에 반영 (평일만). 상태가 실제로 바뀐 토글에서만 호출하고 커밋은 호출부에 맡긴다."""
+    if not is_workday(target_date):
+        return
+    key = {'user_id': user_id, 'weekday': target_date.weekday()}
+    if db.session.query(WeekdayCompletion.id).filter_by(**key).first() is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(WeekdayCompletion(completed=0, **key))
+        except IntegrityError:
+            pass  # 동시 요청이 먼저 만듦
+    WeekdayCompletion.query.filter_by(**key).update(
+        {'completed': WeekdayCompletion.completed + (1 if completed else -1)}, synchronize_session=False)
+
+
+def rebuild_weekday_completions():
+    """월 비트마스크로 요일 카운터 전체 재생성 (popcount(mask & 요일별 평일 마스크))"""
+    WeekdayCompletion.query.delete(synchronize_session=False)
+    counts = {}  # (user_id, weekday) -> 완료 평일 수
+    stmt = db.select(MonthCompletion.user_id, MonthCompletion.year, MonthCompletion.month, MonthCompletion.mask)
+    for uid, year, month, mask in db.session.execute(stmt):
+        for weekday, weekday_mask in enumerate(get_weekday_workday_masks(year, month)):
+            if mask & weekday_mask:
+                counts[(uid, weekday)] = counts.get((uid, weekday), 0) + (mask & weekday_mask).bit_count()
+    db.session.add_all(WeekdayCompletion(user_id=uid, weekday=weekday, completed=count)
+                       for (uid, weekday), count in counts.items())
+    db.session.commit()
+    return len(counts)
 
-    completed_dates = db.session.query(PushupRecord.date).filter(
-        PushupRecord.user_id == user_id,
-        PushupRecord.date >= start_date,
-        PushupRecord.date <= end_date,
-        PushupRecord.completed == True
+
+def compute_streaks(completed_dates):
+    """완료 날짜들로 (마지막 완료 평일에서 끝나는 연속 수, 최고 연속 수, 마지막 완료 평일) 계산"""
+    current = best = 0
+    last = None
+    for d in sorted(d for d in completed_dates if is_workday(d)):
+        current = current + 1 if last is not None and d == next_workday(last) else 1
+        best = max(best, current)
+        last = d
+    return current, best, last
+
+
+def rebuild_user_streak(user):
+    """유저 전체 기록으로 연속 달성 재계산 (과거 날짜 소급 토글 시)"""
+    rows = db.session.query(MonthCompletion.year, MonthCompletion.month, MonthCompletion.mask).filter(
+        MonthCompletion.user_id == user.id
     ).all()
-    completed_dates = [r[0] for r in completed_dates]
+    dates = [d for y, m, mask in rows for d in month_mask_dates(y, m, mask)]
+    user.current_streak, user.best_streak, user.last_completed_workday = compute_streaks(dates)
+
+
+def update_streak_on_toggle(user, target_date, completed):
+    """토글 결과를 연속 달성 카운터에 반영. 최신 날짜를 이어 붙이는 경우는 O(1), 소급 수정만 재계산.
+    호출 전에 update_month_completion으로 월 비트마스크가 갱신되어 있어야 한다.
+    """
+    if not is_workday(target_date):
+        return
+    last = user.last_completed_workday
+    if completed and (last is None or target_date > last):
+        if last is not None and target_date == next_workday(last):
+            user.current_streak += 1
+        else:
+            user.current_streak = 1
+        user.best_streak = max(user.best_streak, user.current_streak)
+        user.last_completed_workday = target_date
+        return
+    db.session.flush()
+    rebuild_user_streak(user)
+
+
+def effective_current_streak(user_streak, last_completed_workday, today=None):
+    """화면용 현재 연속 수. 마지막 완료 이후 지나간 평일을 놓쳤으면 0 (오늘은 아직 진행 중으로 간주)."""
+    if not last_completed_workday:
+        return 0
+    today = today or today_kst()
+    if last_completed_workday >= previous_workday(today):
+        return user_streak
+    return 0
+
+
+PENALTY_PER_DAY = 10000
+
+
+def is_month_closed(year, month):
+    """이미 끝난 달인지 (KST 기준 이번 달보다 이전)"""
+    today = today_kst()
+    return (year, month) < (today.year, today.month)
+
+
+def _compute_month_penalties(year, month, user_ids):
+    """월 비트마스크로 유저별 월 벌금 계산 (유저당 한 행, 완료 평일 수 = popcount(mask & 평일 마스크)).
+    반환: {user_id: {'penalty', 'missed_days', 'completed_days', 'total_workdays', 'first_check_at'}}
+    """
+    workday_mask = get_workday_mask(year, month)
+    total_workdays = workday_mask.bit_count()
+
+    masks = {}  # user_id -> (mask, first_check_at)
+    if user_ids:
+        rows = db.session.query(
+            MonthCompletion.user_id, MonthCompletion.mask, MonthCompletion.first_check_at
+        ).filter(
+            MonthCompletion.year == year,
+            MonthCompletion.month == month,
+            MonthCompletion.user_id.in_(user_ids)
+        ).all()
+        masks = {uid: (mask, first_check_at) for uid, mask, first_check_at in rows}
+
+    result = {}
+    for uid in user_ids:
+        mask, first_check_at = masks.get(uid, (0, None))
+        completed_count = (mask & workday_mask).bit_count()
+        missed_count = total_workdays - completed_count
+        result[uid] = {
+            'penalty': missed_count * PENALTY_PER_DAY,
+            'missed_days': missed_count,
+            'completed_days': completed_count,
+            'total_workdays': total_workdays,
+            'first_check_at': first_check_at,
+        }
+    return result
+
+
+def _ledger_entry(row):
+    return {
+        'penalty': row.penalty,
+        'missed_days': row.missed_days,
+        'completed_days': row.completed_days,
+        'total_workdays': row.total_workdays,
+        'first_check_at': row.first_check_at,
+    }
+
+
+def _freeze_month_penalties(year, month, computed):
+    """마감된 달의 계산 결과를 원장에 기록. 동시 요청과 경합하면 조용히 포기.
+
+    replica에서 읽은 값은 소급 수정이 아직 반영되지 않았을 수 있으므로 확정하지 않는다
+    (계산값은 호출부가 그대로 쓰고, 확정은 primary로 조회하는 요청이 맡음).
+    """
+    if g.get('db_route') == 'replica':
+        return
+    try:
+        # 계산에 쓴 비트마스크 행을 잠그고 다시 계산 → 그 사이 소급 토글이 끼어들었으면 확정하지 않음.
+        # 토글은 비트마스크를 먼저 고친 뒤 원장을 지우므로, 잠금 순서상 어느 쪽이 먼저든 낡은 값이 남지 않는다.
+        # (행이 없으면 잠글 대상이 없으므로 빈 행을 먼저 만듦)
+        for uid in computed:
+            ensure_month_completion(uid, year, month)
+        db.session.query(MonthCompletion.id).filter(
+            MonthCompletion.year == year,
+            MonthCompletion.month == month,
+            MonthCompletion.user_id.in_(list(computed))
+        ).with_for_update().all()
+        current = _compute_month_penalties(year, month, list(computed))
+        for uid, entry in computed.items():
+            if current[uid] == entry:
+                db.session.add(PenaltyLedger(user_id=uid, year=year, month=month, **entry))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+
+def get_month_penalties(year, month, user_ids):
+    """유저별 월 벌금. 마감된 달은 원장에서 읽고, 원장에 없는 유저만 한 번 계산해 확정한다."""
+    user_ids = list(user_ids)
+    if not is_month_closed(year, month):
+        return _compute_month_penalties(year, month, user_ids)
+
+    result = {}
+    if user_ids:
+        rows = PenaltyLedger.query.filter(
+            PenaltyLedger.year == year,
+            PenaltyLedger.month == month,
+            PenaltyLedger.user_id.in_(user_ids)
+        ).all()
+        result = {row.user_id: _ledger_entry(row) for row in rows}
+
+    missing = [uid for uid in user_ids if uid not in result]
+    if missing:
+        computed = _compute_month_penalties(year, month, missing)
+        _freeze_month_penalties(year, month, computed)
+        result.update(computed)
+    return result
+
+
+def invalidate_penalty_ledger(user_id, target_date=None):
+    """원장 무효화. 과거 달 토글(소급 수정) 시 그 달만, 날짜 없이 호출하면 유저 전체.
+    커밋은 호출부 트랜잭션에 맡긴다.
+    """
+    query = PenaltyLedger.query.filter(PenaltyLedger.user_id == user_id)
+    if target_date is not None:
+        if not is_month_closed(target_date.year, target_date.month):
+            return
+        query = query.filter(
+            PenaltyLedger.year == target_date.year,
+            PenaltyLedger.month == target_date.month
+        )
+    query.delete(synchronize_session=False)
+
+
+def calculate_penalty(user_id, year, month):
+    """벌금 계산 (미체크 평일 * 10000원)"""
+    entry = get_month_penalties(year, month, [user_id])[user_id]
+    return entry['penalty'], entry['missed_days'], entry['total_workdays']
+
+
+# 델타 동기화 변경 기록 (/api/sync)
+CHANGE_LOG_RETENTION_DAYS = 30  # 이보다 오래 접속 안 한 클라이언트는 reset → 전체 재조회
+CHANGE_LOG_PRUNE_INTERVAL = 3600
+SYNC_MAX_CHANGES = 500
+# 동시 트랜잭션은 id 순서와 커밋 순서가 다를 수 있어, 커서는 id 빈자리(아직 커밋 안 된 앞선 id) 앞에서 멈춘다.
+# 빈자리 뒤 행이 이보다 오래됐으면 롤백으로 버려진 id(PostgreSQL 시퀀스)로 보고 넘어감
+SYNC_GAP_TIMEOUT = 600
+_change_log_pruned_at = 0
+
+
+def log_change(entity, entity_id, op, **data):
+    """변경 기록 추가 (op: upsert | delete). 커밋은 호출부 트랜잭션에 맡긴다."""
+    db.session.add(ChangeLog(entity=entity, entity_id=entity_id, op=op,
+                             data=json.dumps(data, ensure_ascii=False, default=str)))
+    _maybe_prune_change_log()
+
+
+def _settled_changes(rows, since):
+    """since 다음부터 id가 빈틈없이 이어지는 앞부분 (rows는 id 오름차순, id·created_at 필요)"""
+    gap_expired = datetime.utcnow() - timedelta(seconds=SYNC_GAP_TIMEOUT)
+    settled = []
+    expected = since + 1
+    for row in rows:
+        if row.id != expected and row.created_at > gap_expired:
+            break  # 앞선 id의 트랜잭션이 아직 커밋 전일 수 있음 → 다음 동기화 때 이어서
+        settled.append(row)
+        expected = row.id + 1
+    return settled
+
+
+def settled_change_cursor():
+    """앞선 변경이 모두 커밋된 마지막 id (reset·부트스트랩 커서). 최근 SYNC_GAP_TIMEOUT 구간만 훑는다."""
+    gap_expired = datetime.utcnow() - timedelta(seconds=SYNC_GAP_TIMEOUT)
+    start = db.session.query(db.func.max(ChangeLog.id)).filter(ChangeLog.created_at <= gap_expired).scalar() or 0
+    rows = db.session.query(ChangeLog.id, ChangeLog.created_at).filter(ChangeLog.id > start).order_by(ChangeLog.id).all()
+    settled = _settled_changes(rows, start)
+    return settled[-1].id if settled else start
+
+
+def _maybe_prune_change_log():
+    """보관 기간이 지난 기록 정리 (프로세스당 한 시간에 한 번). 정리한 마지막 id는 reset 판단용으로 저장."""
+    global _change_log_pruned_at
+    now = time.time()
+    if now - _change_log_pruned_at < CHANGE_LOG_PRUNE_INTERVAL:
+        return
+    _change_log_pruned_at = now
+    cutoff = datetime.utcnow() - timedelta(days=CHANGE_LOG_RETENTION_DAYS)
+    last_id = db.session.query(db.func.max(ChangeLog.id)).filter(ChangeLog.created_at < cutoff).scalar()
+    if not last_id:
+        return
+    ChangeLog.query.filter(ChangeLog.id <= last_id).delete(synchronize_session=False)
+    config = SiteConfig.query.filter_by(key='CHANGE_LOG_PRUNED_THROUGH').first()
+    if config:
+        config.value = str(last_id)
+    else:
+        db.session.add(SiteConfig(key='CHANGE_LOG_PRUNED_THROUGH', value=str(last_id)))
+
+
+def read_replica(view):
+    """조회 전용 라우트 표시: replica가 설정돼 있고 최근 쓰기로 primary에 고정된 클라이언트가 아니면 replica에서 조회"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if replica_url and not _pinned_to_primary():
+            g.db_route = 'replica'
+        return view(*args, **kwargs)
+    return wrapper
+
 
-    # 미완료 평일 수 계산
-    missed_days = [d for d in workdays if d not in completed_dates]
-    penalty = len(missed_days) * 10000
+def _pinned_to_primary():
+    try:
+        return float(request.cookies.get(REPLICA_PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
 
-    return penalty, len(missed_days), len(workdays)
+
+@app.after_request
+def pin_writer_to_primary(response):
+    """쓰기 요청이 성공하면 잠시 동안 이 클라이언트의 조회를 primary로 고정 (replica 지연 대비)"""
+    if replica_url:
+        if request.method in ('POST', 'PUT', 'DELETE') and response.status_code < 400:
+            response.set_cookie(REPLICA_PIN_COOKIE, str(time.time() + REPLICA_PIN_SECONDS),
+                                max_age=REPLICA_PIN_SECONDS, httponly=True, samesite='Lax')
+        response.headers['X-DB-Route'] = g.get('db_route', 'primary')
+    return response
+
+
+@app.after_request
+def compress_api_response(response):
+    """/api/* JSON·CSV 응답을 Accept-Encoding에 맞춰 brotli/gzip 압축 (크기 임계값 이상만)"""
+    if request.path.startswith('/api/'):
+        return compress_response(response, request.accept_encodings)
+    return response
+
+
+# 정적 번들 빌드 결과 (scripts/build_assets.py). 없으면 템플릿 직접 렌더링.
+ASSET_DIST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'dist')
+_asset_build = {'loaded': False, 'manifest': None, 'shell': {}, 'service_worker': None}
+
+
+def get_asset_build():
+    """빌드 매니페스트와 HTML 셸(원본/gzip/brotli 바이트)을 처음 한 번만 읽어 메모리에 보관"""
+    if _asset_build['loaded']:
+        return _asset_build
+    try:
+        with open(os.path.join(ASSET_DIST_DIR, 'asset-manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        shell_path = os.path.join(ASSET_DIST_DIR, manifest['shell'])
+        shell = {}
+        for encoding, suffix in (('identity', ''), ('gzip', '.gz'), ('br', '.br')):
+            if os.path.exists(shell_path + suffix):
+                with open(shell_path + suffix, 'rb') as f:
+                    shell[encoding] = f.read()
+        if 'identity' in shell:
+            _asset_build['manifest'] = manifest
+            _asset_build['shell'] = shell
+    except (OSError, ValueError, KeyError):
+        pass
+    _asset_build['loaded'] = True
+    return _asset_build
 
 
 @app.route('/')
 def index():
-    """메인 페이지"""
-    return render_template('index.html')
+    """메인 페이지. 빌드된 HTML 셸이 있으면 메모리에서 사전 압축본을 바로 서빙."""
+    build = get_asset_build()
+    if not build['manifest']:
+        return render_template('index.html')
+
+    shell = build['shell']
+    encoding = 'identity'
+    for candidate in ('br', 'gzip'):
+        if candidate in shell and request.accept_encodings[candidate]:
+            encoding = candidate
+            break
+
+    resp = Response(shell[encoding], mimetype='text/html')
+    if encoding != 'identity':
+        resp.headers['Content-Encoding'] = encoding
+    resp.headers['Vary'] = 'Accept-Encoding'
+    resp.headers['Cache-Control'] = 'no-cache'  # 셸은 매번 ETag 재검증, 번들은 해시 URL로 장기 캐시
+    resp.set_etag(f"{build['manifest']['build_id']}-{encoding}")
+    return resp.make_conditional(request)
 
 
 @app.route('/manifest.json')
@@ -362,8 +1498,29 @@ def manifest():
 
 @app.route('/service-worker.js')
 def service_worker():
-    """서비스 워커 파일 (루트에서 제공해야 스코프가 전체 사이트)"""
-    return send_from_directory('static', 'service-worker.js', mimetype='application/javascript')
+    """서비스 워커 파일 (루트에서 제공해야 스코프가 전체 사이트)
+    빌드 결과가 있으면 프리캐시 목록과 캐시 버전을 해시 자산 매니페스트로 채워서 제공.
+    """
+    build = get_asset_build()
+    if not build['manifest']:
+        return send_from_directory('static', 'service-worker.js', mimetype='application/javascript')
+
+    if build['service_worker'] is None:
+        with open(os.path.join(app.static_folder, 'service-worker.js'), encoding='utf-8') as f:
+            script = f.read()
+        manifest_data = build['manifest']
+        script = script.replace(
+            "const BUILD_ID = 'dev';",
+            f"const BUILD_ID = {json.dumps(manifest_data['build_id'])};", 1
+        ).replace(
+            'const BUILD_ASSETS = [];',
+            f"const BUILD_ASSETS = {json.dumps(manifest_data['precache'])};", 1
+        )
+        build['service_worker'] = script.encode('utf-8')
+
+    resp = Response(build['service_worker'], mimetype='application/javascript')
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
 
 
 @app.route('/api/login', methods=['POST'])
@@ -380,6 +1537,8 @@ def login():
     if not user:
         user = User(name=name)
         db.session.add(user)
+        db.session.flush()
+        log_change('user', user.id, 'upsert', name=name)
         db.session.commit()
 
     return jsonify({
@@ -390,29 +1549,35 @@ def login():
 
 
 @app.route('/api/calendar/<int:year>/<int:month>')
+@read_replica
 def get_calendar(year, month):
     """캘린더 데이터 조회"""
     user_id = request.args.get('user_id', type=int)
 
     if not user_id:
         return jsonify({'error': '로그인이 필요합니다'}), 401
+    return jsonify(build_calendar_payload(user_id, year, month))
+
 
-    # 해당 월의 기록 조회
-    start_date = date(year, month, 1)
+def build_calendar_payload(user_id, year, month):
+    """캘린더 응답 본문 (/api/calendar, /api/bootstrap 공용)"""
     _, last_day = monthrange(year, month)
-    end_date = date(year, month, last_day)
 
-    records = PushupRecord.query.filter(
-        PushupRecord.user_id == user_id,
-        PushupRecord.date >= start_date,
-        PushupRecord.date <= end_date
-    ).all()
+    # 유저 행에 그 달 완료 비트마스크를 outer join → 연속 달성 카운터까지 한 행으로 조회
+    streak = db.session.query(
+        User.current_streak, User.best_streak, User.last_completed_workday, MonthCompletion.mask
+    ).outerjoin(MonthCompletion, db.and_(
+        MonthCompletion.user_id == User.id,
+        MonthCompletion.year == year,
+        MonthCompletion.month == month
+    )).filter(User.id == user_id).first()
 
-    completed_date_set = {r.date for r in records if r.completed}
-    completed_dates = [d.isoformat() for d in sorted(completed_date_set)]
+    mask = (streak.mask or 0) if streak else 0
+    completed_dates = [d.isoformat() for d in month_mask_dates(year, month, mask)]
 
     # 공휴일 정보
     holiday_dates = []
+    kr_holidays = get_kr_holidays()
     for day in range(1, last_day + 1):
         current_date = date(year, month, day)
         if current_date in kr_holidays:
@@ -421,13 +1586,13 @@ def get_calendar(year, month):
                 'name': kr_holidays.get(current_date)
             })
 
-    # 벌금 계산 (이미 조회한 records 재사용 — 추가 DB 쿼리 없음)
-    workdays = get_month_workdays(year, month)
-    missed_days = len([d for d in workdays if d not in completed_date_set])
-    total_workdays = len(workdays)
-    penalty = missed_days * 10000
+    # 벌금 계산 (비트마스크 popcount — 추가 DB 쿼리 없음)
+    workday_mask = get_workday_mask(year, month)
+    total_workdays = workday_mask.bit_count()
+    missed_days = total_workdays - (mask & workday_mask).bit_count()
+    penalty = missed_days * PENALTY_PER_DAY
 
-    return jsonify({
+    return {
         'year': year,
         'month': month,
         'completed_dates': completed_dates,
@@ -436,16 +1601,22 @@ def get_calendar(year, month):
         'missed_days': missed_days,
         'total_workdays': total_workdays,
         'first_day_weekday': date(year, month, 1).weekday(),
-        'last_day': last_day
-    })
+        'last_day': last_day,
+        'current_streak': effective_current_streak(streak.current_streak, streak.last_completed_workday) if streak else 0,
+        'best_streak': streak.best_streak if streak else 0,
+    }
 
 
 @app.route('/api/toggle', methods=['POST'])
 def toggle_completion():
-    """완료 상태 토글"""
+    """완료 상태 토글.
+
+    completed(true/false)를 함께 보내면 뒤집지 않고 그 상태로 맞춤 → 오프라인 큐 재전송이 중복돼도 안전.
+    """
     data = request.get_json()
     user_id = data.get('user_id')
     date_str = data.get('date')
+    desired = data.get('completed')
 
     if not user_id or not date_str:
         return jsonify({'error': '필수 정보가 누락되었습니다'}), 400
@@ -462,69 +1633,88 @@ def toggle_completion():
         date=target_date
     ).first()
 
-    if record:
-        # 기존 기록이 있으면 삭제 (토글 off)
-        db.session.delete(record)
-        db.session.commit()
-        return jsonify({'completed': False})
+    # 압축된 연도면 압축본 비트가 기준
+    archive = None
+    if is_archivable_year(target_date.year):
+        archive = RecordArchive.query.filter_by(user_id=user_id, year=target_date.year).first()
+    was_completed = record is not None or (
+        archive is not None and target_date in archive_month_dates(archive, target_date.month))
+
+    user = db.session.get(User, user_id)
+    if desired is not None and bool(desired) == was_completed:
+        # 이미 원하는 상태 → 변경 없음
+        completed = was_completed
     else:
-        # 새 기록 생성 (토글 on)
-        record = PushupRecord(user_id=user_id, date=target_date, completed=True)
-        db.session.add(record)
+        if archive is not None:
+            # 압축본 비트만 수정 (원본 행은 만들지 않음)
+            completed = not was_completed
+            set_archive_bits(archive, [target_date], completed)
+            if record:
+                db.session.delete(record)
+            log_change('record', user_id, 'upsert' if completed else 'delete', user_id=user_id, date=target_date)
+        elif record:
+            # 기존 기록이 있으면 삭제 (토글 off)
+            log_change('record', record.user_id, 'delete', user_id=record.user_id, date=target_date)
+            db.session.delete(record)
+            completed = False
+        else:
+            # 새 기록 생성 (토글 on)
+            record = PushupRecord(user_id=user_id, date=target_date, completed=True)
+            db.session.add(record)
+            log_change('record', record.user_id, 'upsert', user_id=record.user_id, date=target_date)
+            completed = True
+
+        update_month_completion(user_id, target_date, completed)
+        update_weekday_completion(user_id, target_date, completed)
+        # 지난달 소급 수정이면 확정된 벌금 원장 무효화 (비트마스크 갱신 뒤 — _freeze_month_penalties 참고)
+        invalidate_penalty_ledger(user_id, target_date)
+        if user:
+            update_streak_on_toggle(user, target_date, completed)
         db.session.commit()
-        return jsonify({'completed': True})
+
+    response = {'completed': completed}
+    if user:
+        response['current_streak'] = effective_current_streak(user.current_streak, user.last_completed_workday)
+        response['best_streak'] = user.best_streak
+    return jsonify(response)
 
 
 @app.route('/api/ranking')
+@read_replica
 def get_ranking():
     """벌금 랭킹 (명예의 전당)"""
     year = request.args.get('year', today_kst().year, type=int)
     month = request.args.get('month', today_kst().month, type=int)
+    group_id = request.args.get('group_id', type=int)
+    if group_id and not can_view_group(group_id, request.args.get('user_id', type=int)):
+        return jsonify({'error': '권한이 없습니다'}), 403
+    return jsonify(build_ranking_payload(year, month, group_id))
 
-    # 해당 월 범위
-    start_date = date(year, month, 1)
-    _, last_day = monthrange(year, month)
-    end_date = date(year, month, last_day)
-
-    workdays = get_month_workdays(year, month)
-    total_workdays = len(workdays)
-    workdays_set = set(workdays)
-
-    users = User.query.all()
-
-    # 한 번의 쿼리로 해당 월의 모든 기록 가져오기
-    all_records = PushupRecord.query.filter(
-        PushupRecord.date >= start_date,
-        PushupRecord.date <= end_date
-    ).all()
 
-    # 유저별로 분류
-    user_completed = {}  # user_id -> set of completed dates
-    user_first_check = {}  # user_id -> earliest created_at
+def build_ranking_payload(year, month, group_id=None):
+    """랭킹 응답 본문 (/api/ranking, /api/bootstrap 공용)"""
+    # 그룹이 지정되면 그 그룹 멤버만 집계 → 비용이 그룹 크기에만 비례
+    users = get_scope_users(group_id)
 
-    for record in all_records:
-        uid = record.user_id
-        if record.completed:
-            user_completed.setdefault(uid, set()).add(record.date)
-        if uid not in user_first_check or record.created_at < user_first_check[uid]:
-            user_first_check[uid] = record.created_at
+    # 지난달은 원장에서, 이번 달은 한 번의 쿼리로 계산
+    penalties = get_month_penalties(year, month, [u.id for u in users])
 
     rankings = []
     for user in users:
-        completed_set = user_completed.get(user.id, set())
-        missed_count = len(workdays_set - completed_set)
-        completed_days = total_workdays - missed_count
-        penalty = missed_count * 10000
-        first_check_time = user_first_check.get(user.id, datetime.max)
+        entry = penalties[user.id]
+        total_workdays = entry['total_workdays']
+        completed_days = entry['completed_days']
 
         rankings.append({
             'id': user.id,
             'name': user.name,
-            'penalty': penalty,
+            'penalty': entry['penalty'],
             'completed_days': completed_days,
             'total_workdays': total_workdays,
             'completion_rate': round(completed_days / total_workdays * 100, 1) if total_workdays > 0 else 0,
-            'first_check_time': first_check_time
+            'current_streak': effective_current_streak(user.current_streak, user.last_completed_workday),
+            'best_streak': user.best_streak,
+            'first_check_time': entry['first_check_at'] or datetime.max
         })
 
     # 정렬: 벌금 적은 순 → 먼저 체크한 순
@@ -535,7 +1725,79 @@ def get_ranking():
         r['rank'] = i + 1
         del r['first_check_time']
 
-    return jsonify(rankings)
+    return rankings
+
+
+@app.route('/api/analytics')
+@read_replica
+def get_analytics():
+    """요일별 히트맵 + 월별 완료율 추이"""
+    user_id = request.args.get('user_id', type=int)
+    if not user_id:
+        return jsonify({'error': '로그인이 필요합니다'}), 401
+    user = db.session.get(User, user_id)
+    if not user:
+        return jsonify({'error': '사용자를 찾을 수 없습니다'}), 404
+    return jsonify(build_analytics_payload(user))
+
+
+def build_analytics_payload(user):
+    """요일 카운터 5행 + 월 비트마스크 행으로 계산 (원본 기록·날짜별 is_workday 스캔 없음).
+    기간은 가입한 달(또는 더 이른 첫 완료 달)부터 이번 달까지. 분모(요일별 평일 수)는 마감된 달 캐시.
+    """
+    today = today_kst()
+    masks = {(y, m): mask for y, m, mask in db.session.query(
+        MonthCompletion.year, MonthCompletion.month, MonthCompletion.mask
+    ).filter(MonthCompletion.user_id == user.id, MonthCompletion.mask != 0)}
+    completed_by_weekday = dict(db.session.query(WeekdayCompletion.weekday, WeekdayCompletion.completed).filter(
+        WeekdayCompletion.user_id == user.id))
+
+    starts = list(masks)
+    if user.created_at:
+        starts.append((user.created_at.year, user.created_at.month))
+    year, month = min(starts, default=(today.year, today.month))
+
+    months = []
+    workdays_by_weekday = [0] * len(WEEKDAY_LABELS)
+    while (year, month) <= (today.year, today.month):
+        weekday_masks = get_weekday_workday_masks(year, month)
+        workday_mask = 0
+        for weekday, weekday_mask in enumerate(weekday_masks):
+            workday_mask |= weekday_mask
+            workdays_by_weekday[weekday] += weekday_mask.bit_count()
+        total = workday_mask.bit_count()
+        completed = (masks.get((year, month), 0) & workday_mask).bit_count()
+        months.append({
+            'year': year,
+            'month': month,
+            'completed_days': completed,
+            'total_workdays': total,
+            'rate': round(completed / total * 100, 1) if total else None,
+        })
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    weekdays = []
+    for weekday, label in enumerate(WEEKDAY_LABELS):
+        total = workdays_by_weekday[weekday]
+        completed = min(completed_by_weekday.get(weekday, 0), total)  # 공휴일 지정 변경 등으로 어긋난 경우
+        weekdays.append({
+            'weekday': weekday,
+            'label': label,
+            'completed_days': completed,
+            'missed_days': total - completed,
+            'total_workdays': total,
+            'rate': round(completed / total * 100, 1) if total else None,
+        })
+
+    completed = sum(m['completed_days'] for m in months)
+    total = sum(m['total_workdays'] for m in months)
+    return {
+        'weekdays': weekdays,
+        'months': months,
+        'completed_days': completed,
+        'total_workdays': total,
+        'rate': round(completed / total * 100, 1) if total else None,
+    }
 
 
 @app.route('/api/available-months')
@@ -544,44 +1806,319 @@ def get_available_months():
     today = today_kst()
     months = []
 
-    # 최근 12개월
-    for i in range(12):
-        year = today.year
-        month = today.month - i
+    # 최근 12개월
+    for i in range(12):
+        year = today.year
+        month = today.month - i
+
+        while month <= 0:
+            month += 12
+            year -= 1
+
+        months.append({
+            'year': year,
+            'month': month,
+            'label': f'{year}년 {month}월'
+        })
+
+    return jsonify(months)
+
+
+@app.route('/api/sync')
+@read_replica
+def sync_changes():
+    """델타 동기화: since 커서 이후의 변경(톰스톤 포함)만 반환.
+
+    reset=true면 커서가 너무 오래돼(정리됨) 변경분을 줄 수 없으니 클라이언트가 전체를 다시 받아야 함.
+    has_more=true면 받은 cursor로 한 번 더 호출.
+    """
+    since = request.args.get('since', type=int)
+    config = SiteConfig.query.filter_by(key='CHANGE_LOG_PRUNED_THROUGH').first()
+    pruned_through = int(config.value) if config else 0
+
+    if since is None or since < pruned_through:
+        return jsonify({'cursor': settled_change_cursor(), 'reset': True, 'has_more': False, 'changes': []})
+
+    # since > 최신 id는 replica 지연일 수 있으므로 reset 없이 빈 응답 (커서 유지)
+    rows = ChangeLog.query.filter(ChangeLog.id > since).order_by(ChangeLog.id).limit(SYNC_MAX_CHANGES + 1).all()
+    rows = _settled_changes(rows, since)
+    has_more = len(rows) > SYNC_MAX_CHANGES
+    rows = rows[:SYNC_MAX_CHANGES]
+
+    changes = []
+    for row in rows:
+        change = json.loads(row.data or '{}')
+        change.update({'v': row.id, 'entity': row.entity, 'id': row.entity_id, 'op': row.op})
+        if row.entity == 'record':
+            change['id'] = f"{change['user_id']}:{change['date']}"  # 원본 행/압축본 여부와 무관한 (유저, 날짜) 키
+        changes.append(change)
+
+    return jsonify({
+        'cursor': rows[-1].id if rows else since,
+        'reset': False,
+        'has_more': has_more,
+        'changes': changes,
+    })
+
+
+@app.route('/api/penalty/summary')
+@read_replica
+def get_penalty_summary():
+    """연간 유저별 벌금 합계. 마감된 달은 원장 한 번 조회로 모으고, 진행 중인 달만 실시간 계산."""
+    today = today_kst()
+    year = request.args.get('year', today.year, type=int)
+    if year > today.year:
+        return jsonify({'error': '미래 연도는 조회할 수 없습니다'}), 400
+
+    group_id = request.args.get('group_id', type=int)
+    if group_id and not can_view_group(group_id, request.args.get('user_id', type=int)):
+        return jsonify({'error': '권한이 없습니다'}), 403
+
+    last_month = 12 if year < today.year else today.month
+    users = get_scope_users(group_id)
+    user_ids = [u.id for u in users]
+
+    # 해당 연도 원장 전체를 한 번에 조회
+    by_month = {}  # month -> {user_id: entry}
+    ledger_rows = PenaltyLedger.query.filter(
+        PenaltyLedger.year == year,
+        PenaltyLedger.user_id.in_(user_ids)
+    ).all() if user_ids else []
+    for row in ledger_rows:
+        by_month.setdefault(row.month, {})[row.user_id] = _ledger_entry(row)
+
+    for month in range(1, last_month + 1):
+        month_entries = by_month.setdefault(month, {})
+        if not is_month_closed(year, month):
+            month_entries.update(_compute_month_penalties(year, month, user_ids))
+            continue
+        # 아직 원장에 없는 유저(신규 가입 등)만 한 번 계산해 확정
+        missing = [uid for uid in user_ids if uid not in month_entries]
+        if missing:
+            computed = _compute_month_penalties(year, month, missing)
+            _freeze_month_penalties(year, month, computed)
+            month_entries.update(computed)
+
+    summary = []
+    for user in users:
+        months = []
+        for month in range(1, last_month + 1):
+            entry = by_month[month][user.id]
+            months.append({
+                'month': month,
+                'penalty': entry['penalty'],
+                'missed_days': entry['missed_days'],
+                'total_workdays': entry['total_workdays'],
+                'closed': is_month_closed(year, month),
+            })
+        summary.append({
+            'id': user.id,
+            'name': user.name,
+            'total_penalty': sum(m['penalty'] for m in months),
+            'missed_days': sum(m['missed_days'] for m in months),
+            'total_workdays': sum(m['total_workdays'] for m in months),
+            'months': months,
+        })
+
+    summary.sort(key=lambda x: (x['total_penalty'], x['name']))
+    return jsonify({'year': year, 'users': summary})
+
+
+INVITE_CODE_ALPHABET = string.ascii_uppercase + string.digits
+
+
+def _new_invite_code():
+    """중복되지 않는 6자리 초대 코드"""
+    while True:
+        code = ''.join(secrets.choice(INVITE_CODE_ALPHABET) for _ in range(6))
+        if not ChallengeGroup.query.filter_by(invite_code=code).first():
+            return code
+
+
+def _group_dict(group, role=None):
+    return {
+        'id': group.id,
+        'name': group.name,
+        'invite_code': group.invite_code,
+        'role': role,
+    }
+
+
+@app.route('/api/groups')
+@read_replica
+def get_my_groups():
+    """내가 속한 그룹 목록"""
+    user_id = request.args.get('user_id', type=int)
+    if not user_id:
+        return jsonify({'error': '로그인이 필요합니다'}), 401
+
+    rows = db.session.query(ChallengeGroup, GroupMember.role).join(
+        GroupMember, GroupMember.group_id == ChallengeGroup.id
+    ).filter(GroupMember.user_id == user_id).order_by(GroupMember.joined_at).all()
+    return jsonify([_group_dict(g, role) for g, role in rows])
+
+
+@app.route('/api/groups', methods=['POST'])
+def create_group():
+    """그룹 생성 (만든 사람이 그룹 관리자)"""
+    data = request.get_json()
+    user_id = data.get('user_id')
+    user = db.session.get(User, user_id) if user_id else None
+    if not user:
+        return jsonify({'error': '로그인이 필요합니다'}), 401
+
+    name = data.get('name', '').strip()
+    if not name:
+        return jsonify({'error': '그룹 이름을 입력해주세요'}), 400
+
+    group = ChallengeGroup(name=name, invite_code=_new_invite_code(), created_by=user.id)
+    db.session.add(group)
+    db.session.flush()
+    db.session.add(GroupMember(group_id=group.id, user_id=user.id, role='admin'))
+    db.session.commit()
+
+    return jsonify(_group_dict(group, 'admin'))
+
+
+@app.route('/api/groups/join', methods=['POST'])
+def join_group():
+    """초대 코드로 그룹 참여"""
+    data = request.get_json()
+    user_id = data.get('user_id')
+    user = db.session.get(User, user_id) if user_id else None
+    if not user:
+        return jsonify({'error': '로그인이 필요합니다'}), 401
+
+    code = data.get('invite_code', '').strip().upper()
+    group = ChallengeGroup.query.filter_by(invite_code=code).first() if code else None
+    if not group:
+        return jsonify({'error': '초대 코드를 확인해주세요'}), 404
+
+    if get_membership(group.id, user.id):
+        return jsonify({'error': '이미 참여 중인 그룹입니다'}), 400
+
+    db.session.add(GroupMember(group_id=group.id, user_id=user.id, role='member'))
+    db.session.commit()
+
+    return jsonify(_group_dict(group, 'member'))
+
+
+@app.route('/api/groups/<int:group_id>/leave', methods=['POST'])
+def leave_group(group_id):
+    """그룹 탈퇴"""
+    data = request.get_json()
+    user_id = data.get('user_id')
+
+    membership = get_membership(group_id, user_id)
+    if not membership:
+        return jsonify({'error': '참여 중인 그룹이 아닙니다'}), 404
+
+    if membership.role == 'admin':
+        admin_count = GroupMember.query.filter_by(group_id=group_id, role='admin').count()
+        if admin_count <= 1:
+            return jsonify({'error': '마지막 관리자는 탈퇴할 수 없습니다'}), 400
+
+    db.session.delete(membership)
+    db.session.commit()
+
+    return jsonify({'success': True})
+
+
+@app.route('/api/groups/<int:group_id>/members')
+@read_replica
+def get_group_members(group_id):
+    """그룹 멤버 목록 (멤버만 조회 가능)"""
+    user_id = request.args.get('user_id', type=int)
+    user = db.session.get(User, user_id) if user_id else None
+    if not user or not (get_membership(group_id, user.id) or is_admin(user.name)):
+        return jsonify({'error': '권한이 없습니다'}), 403
+
+    rows = db.session.query(User, GroupMember).join(
+        GroupMember, GroupMember.user_id == User.id
+    ).filter(GroupMember.group_id == group_id).order_by(GroupMember.joined_at).all()
+    return jsonify([{
+        'id': u.id,
+        'name': u.name,
+        'role': m.role,
+        'joined_at': m.joined_at.strftime('%Y-%m-%d') if m.joined_at else ''
+    } for u, m in rows])
+
+
+@app.route('/api/groups/<int:group_id>/members/<int:target_id>', methods=['PUT'])
+def update_group_member(group_id, target_id):
+    """멤버 역할 변경 (그룹 관리자 전용)"""
+    data = request.get_json()
+    user_id = data.get('user_id')
+    user = db.session.get(User, user_id) if user_id else None
+    if not is_group_admin(user, group_id):
+        return jsonify({'error': '권한이 없습니다'}), 403
+
+    role = data.get('role')
+    if role not in ('admin', 'member'):
+        return jsonify({'error': '역할은 admin 또는 member입니다'}), 400
+
+    membership = get_membership(group_id, target_id)
+    if not membership:
+        return jsonify({'error': '멤버를 찾을 수 없습니다'}), 404
+
+    if membership.role == 'admin' and role == 'member':
+        admin_count = GroupMember.query.filter_by(group_id=group_id, role='admin').count()
+        if admin_count <= 1:
+            return jsonify({'error': '마지막 관리자는 일반 멤버로 바꿀 수 없습니다'}), 400
+
+    membership.role = role
+    db.session.commit()
+
+    return jsonify({'success': True, 'role': role})
+
+
+@app.route('/api/groups/<int:group_id>/members/<int:target_id>', methods=['DELETE'])
+def remove_group_member(group_id, target_id):
+    """멤버 내보내기 (그룹 관리자 전용)"""
+    data = request.get_json()
+    user_id = data.get('user_id')
+    user = db.session.get(User, user_id) if user_id else None
+    if not is_group_admin(user, group_id):
+        return jsonify({'error': '권한이 없습니다'}), 403
+
+    membership = get_membership(group_id, target_id)
+    if not membership:
+        return jsonify({'error': '멤버를 찾을 수 없습니다'}), 404
+    if membership.role == 'admin':
+        return jsonify({'error': '관리자는 내보낼 수 없습니다'}), 400
 
-        while month <= 0:
-            month += 12
-            year -= 1
+    db.session.delete(membership)
+    db.session.commit()
 
-        months.append({
-            'year': year,
-            'month': month,
-            'label': f'{year}년 {month}월'
-        })
+    return jsonify({'success': True})
 
-    return jsonify(months)
 
+def holding_currency(stock, market, price_data=None):
+    """보유 종목의 통화: 직접 지정값 > 시세 응답 통화(해외) > 시장 기본 통화"""
+    if stock.currency:
+        return stock.currency
+    if price_data and price_data.get('currency'):
+        return price_data['currency']
+    return MARKET_CURRENCY.get(market, 'USD')
 
-@app.route('/api/assets')
-def get_assets():
-    """전체 자산 조회 (실시간 주가 + 환율 포함)"""
-    stocks = StockHolding.query.all()
-    stock_list = []
-    total_stock_value_usd = 0
-    total_stock_value_krw_direct = 0   # 한국주식 평가액 합계
-    total_stock_cost_usd = 0           # 미국주식 총 투자금 합계(USD)
-    total_stock_cost_krw_direct = 0    # 한국주식 총 투자금 합계(KRW)
 
-    usd_krw = get_usd_krw_rate()
+def build_assets_payload():
+    """전체 자산 평가 (실시간 주가 + 환율 포함)
+    종목은 각자 통화(KRW/USD/JPY/EUR/HKD 등)로 평가하고, 환율표 1회 조회로 만든
+    통화별 환산 계수(→KRW, →USD)를 전 종목에 일괄 적용한다.
+    """
+    stocks = StockHolding.query.all()
     now_str = datetime.utcnow().strftime('%Y.%m.%d %H:%M')
 
+    # 1) 종목별 원통화 시세 수집
+    positions = []
     for s in stocks:
         market = detect_market(s.symbol)
 
         # 회사명 레이지 백필 (기존 데이터용)
         display_name = s.name
         if not display_name:
-            fetched = get_stock_name(s.symbol)
+            fetched = get_stock_name(s.symbol, PRIORITY_BUILD)
             if fetched:
                 s.name = fetched
                 display_name = fetched
@@ -590,113 +2127,402 @@ def get_assets():
                 except Exception:
                     db.session.rollback()
 
-        if market == 'KR':
-            # 한국 주식: Yahoo Finance로 실시간 시세 조회
-            # 실패 시 수동 입력 current_price, 그것도 없으면 avg_price로 폴백
-            avg_price_krw = s.avg_price or 0
-            price_data = get_stock_price(s.symbol)
-
-            if price_data and price_data.get('c'):
-                current_price_krw = float(price_data['c'])
-                day_change_percent = round(float(price_data.get('dp', 0) or 0), 2)
-            elif s.current_price and s.current_price > 0:
-                current_price_krw = s.current_price
-                day_change_percent = 0
-            else:
-                current_price_krw = avg_price_krw
-                day_change_percent = 0
-
-            value_krw = round(current_price_krw * s.shares)
-            cost_krw = round(avg_price_krw * s.shares)
-            gain_krw = value_krw - cost_krw
-            gain_percent = round((gain_krw / cost_krw * 100), 2) if cost_krw > 0 else 0
-
-            total_stock_value_krw_direct += value_krw
-            total_stock_cost_krw_direct += cost_krw
-
-            stock_list.append({
-                'id': s.id,
-                'symbol': s.symbol,
-                'name': display_name or s.symbol,
-                'market': market,
-                'currency': 'KRW',
-                'shares': s.shares,
-                'avg_price': avg_price_krw,
-                'current_price': current_price_krw,
-                'change_percent': day_change_percent,
-                'value_usd': 0,
-                'value_krw': value_krw,
-                'cost_usd': 0,
-                'cost_krw': cost_krw,
-                'gain_usd': 0,
-                'gain_krw': gain_krw,
-                'gain_percent': gain_percent,
-            })
+        # 실시간 시세 실패 시 수동 입력 current_price, 그것도 없으면 (US 제외) avg_price로 폴백
+        avg_price = s.avg_price or 0
+        price_data = get_stock_price(s.symbol, PRIORITY_BUILD)
+        quoted = bool(price_data and price_data.get('c'))
+        if quoted:
+            current_price = float(price_data['c'])
+            change_percent = round(float(price_data.get('dp', 0) or 0), 2)
+        elif s.current_price and s.current_price > 0:
+            current_price = s.current_price
+            change_percent = 0
+        elif market != 'US':
+            current_price = avg_price
+            change_percent = 0
         else:
-            price_data = get_stock_price(s.symbol)
-            current_price = price_data['c'] if price_data else 0
-            change_percent = price_data['dp'] if price_data else 0
-            value_usd = current_price * s.shares
-            value_krw = round(value_usd * usd_krw)
-            total_stock_value_usd += value_usd
-
-            cost_usd = s.avg_price * s.shares
-            total_stock_cost_usd += cost_usd
-            gain_usd = value_usd - cost_usd
-            gain_krw = round(gain_usd * usd_krw)
-            cost_krw = round(cost_usd * usd_krw)
-            gain_percent = round((gain_usd / cost_usd * 100), 2) if cost_usd > 0 else 0
-
-            stock_list.append({
-                'id': s.id,
-                'symbol': s.symbol,
-                'name': display_name or s.symbol,
-                'market': market,
-                'currency': 'USD',
-                'shares': s.shares,
-                'avg_price': s.avg_price,
-                'current_price': current_price,
-                'change_percent': round(change_percent, 2),
-                'value_usd': round(value_usd, 2),
-                'value_krw': value_krw,
-                'cost_usd': round(cost_usd, 2),
-                'cost_krw': cost_krw,
-                'gain_usd': round(gain_usd, 2),
-                'gain_krw': gain_krw,
-                'gain_percent': gain_percent,
-            })
+            current_price = 0
+            change_percent = 0
+
+        positions.append({
+            'stock': s,
+            'name': display_name or s.symbol,
+            'market': market,
+            'currency': holding_currency(s, market, price_data),
+            'avg_price': avg_price,
+            'current_price': current_price,
+            'change_percent': change_percent,
+            'quoted': quoted,
+            'value_native': current_price * s.shares,
+            'cost_native': avg_price * s.shares,
+        })
+
+    # 2) 보유 통화별 환산 계수 (환율표 한 번으로 교차환율 계산)
+    rates = get_fx_rates()
+    currencies = {p['currency'] for p in positions} | {'USD', 'KRW'}
+    to_krw = {c: get_fx_rate(c, 'KRW', rates) for c in currencies}
+    to_usd = {c: get_fx_rate(c, 'USD', rates) for c in currencies}
+
+    # 3) 일괄 평가
+    stock_list = []
+    value_by_currency = {}
+    cost_by_currency = {}
+    for p in positions:
+        s = p['stock']
+        ccy = p['currency']
+        krw_rate = to_krw[ccy] or 0
+        usd_rate = to_usd[ccy] or 0
+        value_native = p['value_native']
+        cost_native = p['cost_native']
+        value_by_currency[ccy] = value_by_currency.get(ccy, 0) + value_native
+        cost_by_currency[ccy] = cost_by_currency.get(ccy, 0) + cost_native
+
+        value_krw = round(value_native * krw_rate)
+        cost_krw = round(cost_native * krw_rate)
+        value_usd = value_native * usd_rate
+        cost_usd = cost_native * usd_rate
+
+        stock_list.append({
+            'id': s.id,
+            'symbol': s.symbol,
+            'name': p['name'],
+            'market': p['market'],
+            'currency': ccy,
+            'shares': s.shares,
+            'avg_price': p['avg_price'],
+            'current_price': p['current_price'],
+            'change_percent': p['change_percent'],
+            'value_native': round(value_native, 2),
+            'cost_native': round(cost_native, 2),
+            'fx_rate': krw_rate,
+            'value_usd': round(value_usd, 2),
+            'value_krw': value_krw,
+            'cost_usd': round(cost_usd, 2),
+            'cost_krw': cost_krw,
+            'gain_usd': round(value_usd - cost_usd, 2),
+            'gain_krw': value_krw - cost_krw,
+            'gain_percent': round((value_native - cost_native) / cost_native * 100, 2) if cost_native > 0 else 0,
+            # 시세를 못 받아 폴백 가격으로 평가했거나, 만료된 마지막 값을 쓰는 중이거나, 환율이 없으면 stale
+            'stale': not p['quoted'] or is_price_stale(s.symbol) or to_krw[ccy] is None,
+        })
 
     cash = CashAsset.query.first()
     cash_krw = cash.amount if cash else 0
-    total_stock_krw = round(total_stock_value_usd * usd_krw) + total_stock_value_krw_direct
-    total_cost_krw = round(total_stock_cost_usd * usd_krw) + total_stock_cost_krw_direct
+    total_stock_krw = sum(round(v * (to_krw[c] or 0)) for c, v in value_by_currency.items())
+    total_cost_krw = sum(round(v * (to_krw[c] or 0)) for c, v in cost_by_currency.items())
+    total_stock_usd = sum(v * (to_usd[c] or 0) for c, v in value_by_currency.items())
     total_gain_krw = total_stock_krw - total_cost_krw
     total_gain_percent = round((total_gain_krw / total_cost_krw * 100), 2) if total_cost_krw > 0 else 0
     total_assets_krw = total_stock_krw + cash_krw
+    fx_stale = is_exchange_rate_stale()
 
-    return jsonify({
+    return {
         'stocks': stock_list,
         'cash_krw': cash_krw,
-        'total_stock_usd': round(total_stock_value_usd, 2),
+        'total_stock_usd': round(total_stock_usd, 2),
         'total_stock_krw': total_stock_krw,
         'total_cost_krw': total_cost_krw,
         'total_gain_krw': total_gain_krw,
         'total_gain_percent': total_gain_percent,
         'total_assets_krw': total_assets_krw,
-        'usd_krw': round(usd_krw, 2),
+        'usd_krw': round(to_krw['USD'], 2),
+        'fx_rates': {c: round(to_krw[c], 6) for c in sorted(value_by_currency) if to_krw[c]},
+        'fx_stale': fx_stale,
+        'stale': fx_stale or any(x['stale'] for x in stock_list),
         'updated_at': now_str,
-    })
+    }
+
+
+# /api/assets 응답 캐시: 모든 유저가 같은 포트폴리오를 보므로 직렬화된 본문을
+# (데이터 버전, 시세 세대)마다 한 번만 만들어 요청·워커 간에 공유한다.
+# 데이터 버전은 DB(SiteConfig)에 있어 다른 워커/인스턴스의 수정도 바로 반영되고,
+# 시세 세대는 장중이면 PRICE_CACHE_TTL 구간(최대 1분 단위 갱신), KR·US가 모두 닫혀 있으면
+# 다음 개장 시각이라 밤·주말·휴일에는 다시 만들지 않는다 (price_generation).
+ASSETS_CACHE_DIR = os.environ.get('ASSETS_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'pushups-assets-cache')
+_assets_payload = {'key': None, 'body': None}  # 워커 메모리 계층
+_assets_build_lock = threading.Lock()
+
+
+def get_assets_version():
+    config = SiteConfig.query.filter_by(key='ASSETS_VERSION').first()
+    return config.value if config else '0'
+
+
+def bump_assets_version():
+    """보유 종목/현금/시세 설정 변경 시 호출 (커밋은 호출부). 값은 같은지만 비교하므로 임의 토큰."""
+    token = secrets.token_hex(8)
+    config = SiteConfig.query.filter_by(key='ASSETS_VERSION').first()
+    if config:
+        config.value = token
+    else:
+        db.session.add(SiteConfig(key='ASSETS_VERSION', value=token))
+    _assets_payload['key'] = None
+
+
+def _assets_cache_path(key):
+    return os.path.join(ASSETS_CACHE_DIR, f'assets-{key}.json')
+
+
+def _read_assets_cache(key):
+    try:
+        with open(_assets_cache_path(key), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_assets_cache(key, body):
+    """원자적으로 기록(임시 파일 → rename)하고 이전 세대 파일 정리"""
+    try:
+        os.makedirs(ASSETS_CACHE_DIR, exist_ok=True)
+        path = _assets_cache_path(key)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(body)
+        os.replace(tmp, path)
+        for name in os.listdir(ASSETS_CACHE_DIR):
+            if name.startswith('assets-') and name.endswith('.json') and name != os.path.basename(path):
+                try:
+                    os.remove(os.path.join(ASSETS_CACHE_DIR, name))
+                except OSError:
+                    pass
+    except OSError:
+        pass  # 공유 캐시는 최적화일 뿐 — 실패해도 워커 메모리 캐시로 동작
+
+
+def price_generation(now=None):
+    """자산 캐시 키의 시세 세대"""
+    now = now if now is not None else time.time()
+    dt = datetime.fromtimestamp(now, timezone.utc)
+    if any(is_market_live(m, dt) for m in MARKET_SESSIONS):
+        return str(int(now // PRICE_CACHE_TTL))
+    symbols = {s for (s,) in db.session.query(StockHolding.symbol).distinct()}
+    # 해외 종목은 거래 시간을 모르므로 보유 중이면 분 단위 유지
+    if any(detect_market(s) == 'INTL' for s in symbols):
+        return str(int(now // PRICE_CACHE_TTL))
+    # 조회 실패·만료 시세나 폴백 환율로 만든 응답을 다음 개장까지 고정하지 않도록,
+    # 모든 보유 종목 시세가 캐시에 있고 유효하며 환율도 최신일 때만 휴장 키 사용
+    if is_exchange_rate_stale() or any(symbol not in _price_cache or is_price_stale(symbol) for symbol in symbols):
+        return str(int(now // PRICE_CACHE_TTL))
+    return 'closed-' + str(int(min(next_market_open(m, dt).timestamp() for m in MARKET_SESSIONS)))
+
+
+def assets_cache_key():
+    return f'{get_assets_version()}-{price_generation()}'
+
+
+def get_assets_body(key):
+    """직렬화된 자산 응답 본문. 메모리 → 공유 파일 → 빌드 순.
+    빌드는 프로세스 내 스레드 잠금 + 파일 잠금(flock)으로 워커 간 한 번만 실행된다.
+    """
+    if _assets_payload['key'] == key:
+        return _assets_payload['body']
+
+    body = _read_assets_cache(key)
+    if body is None:
+        with _assets_build_lock:
+            lock_file = None
+            if fcntl is not None:
+                try:
+                    os.makedirs(ASSETS_CACHE_DIR, exist_ok=True)
+                    lock_file = open(os.path.join(ASSETS_CACHE_DIR, 'build.lock'), 'w')
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                except OSError:
+                    lock_file = None
+            try:
+                body = _read_assets_cache(key)  # 기다리는 동안 다른 워커가 만들었을 수 있음
+                if body is None:
+                    body = app.json.response(build_assets_payload()).get_data()
+                    _write_assets_cache(key, body)
+            finally:
+                if lock_file is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    lock_file.close()
+
+    _assets_payload.update(key=key, body=body)
+    return body
+
+
+@app.route('/api/assets')
+@read_replica
+def get_assets():
+    """전체 자산 조회. 평가 결과는 get_assets_body()가 공유 캐시에서 꺼내고, ETag로 304 응답 지원."""
+    key = assets_cache_key()
+    response = app.response_class(get_assets_body(key), mimetype='application/json')
+    response.set_etag(key)
+    return response.make_conditional(request)
+
+
+# 앱 시작 시 캘린더/랭킹/이벤트/자산을 한 번에 (모바일 콜드 스타트 왕복 4회 → 1회)
+BOOTSTRAP_SECTIONS = ('calendar', 'ranking', 'event', 'assets')
+BOOTSTRAP_SECTION_TIMEOUT = 2.0  # 자산 섹션(시세 조회)이 이보다 오래 걸리면 pending으로 보내고 클라이언트가 따로 받음
+BOOTSTRAP_ASSETS_WORKERS = 2
+_bootstrap_pool_state = {'pid': None, 'pool': None, 'lock': threading.Lock()}
+
+
+def _section_version(body):
+    return hashlib.sha1(body).hexdigest()[:16]
+
+
+def _build_bootstrap_section(name, user_id, year, month, group_id):
+    """섹션 하나를 (버전, 직렬화된 본문)으로. 자산은 공유 캐시 본문과 캐시 키(ETag)를 그대로 사용."""
+    if name == 'assets':
+        key = assets_cache_key()
+        return key, get_assets_body(key)
+    if name == 'calendar':
+        payload = build_calendar_payload(user_id, year, month)
+    elif name == 'ranking':
+        payload = build_ranking_payload(year, month, group_id)
+    else:
+        payload = build_event_payload(user_id)
+    body = app.json.dumps(payload).encode('utf-8')
+    return _section_version(body), body
+
+
+def _run_bootstrap_section(name, db_route, *args):
+    # 워커 스레드는 요청 컨텍스트가 없어 DB 라우팅(replica/primary)만 이어받음
+    with app.app_context():
+        if db_route:
+            g.db_route = db_route
+        return _build_bootstrap_section(name, *args)
+
+
+def _bootstrap_pool():
+    """자산 섹션 전용 스레드 풀 (워커 프로세스당 하나, 크기 고정 → DB 연결 사용량도 고정)"""
+    with _bootstrap_pool_state['lock']:
+        if _bootstrap_pool_state['pid'] != os.getpid():
+            _bootstrap_pool_state['pid'] = os.getpid()
+            _bootstrap_pool_state['pool'] = ThreadPoolExecutor(BOOTSTRAP_ASSETS_WORKERS, thread_name_prefix='bootstrap')
+        return _bootstrap_pool_state['pool']
+
+
+def _section_json(name, known, version, body):
+    if known.get(name) == version:
+        return app.json.dumps({'version': version, 'unchanged': True}).encode('utf-8')
+    return b'{"version":' + app.json.dumps(version).encode('utf-8') + b',"data":' + body + b'}'
+
+
+def _section_error(name, e):
+    app.logger.warning('bootstrap %s 실패: %s', name, e)
+    return app.json.dumps({'error': '조회 실패'}).encode('utf-8')
+
+
+@app.route('/api/bootstrap')
+@read_replica
+def bootstrap():
+    """시작 화면 데이터 일괄 조회. DB만 읽는 섹션은 요청 스레드에서 바로 계산하고,
+    시세 조회로 느릴 수 있는 자산만 백그라운드 풀에서 계산해 시간 초과 시 pending으로 보낸다.
+
+    versions=calendar:<v>,ranking:<v>,... 로 클라이언트가 가진 버전을 보내면 같은 섹션은 본문 없이
+    {"version", "unchanged": true}만 보낸다. cursor는 섹션 계산 전 시점의 /api/sync 커서.
+    """
+    user_id = request.args.get('user_id', type=int)
+    if not user_id:
+        return jsonify({'error': '로그인이 필요합니다'}), 401
+    today = today_kst()
+    year = request.args.get('year', today.year, type=int)
+    month = request.args.get('month', today.month, type=int)
+    if not 1 <= month <= 12:
+        return jsonify({'error': '잘못된 월입니다'}), 400
+    group_id = request.args.get('group_id', type=int)
+    if group_id and not can_view_group(group_id, user_id):
+        return jsonify({'error': '권한이 없습니다'}), 403
+    known = dict(item.split(':', 1) for item in request.args.get('versions', '').split(',') if ':' in item)
+
+    cursor = settled_change_cursor()
+    args = (user_id, year, month, group_id)
+    deadline = time.monotonic() + BOOTSTRAP_SECTION_TIMEOUT
+
+    # 자산: 메모리에 최신 본문이 있으면 바로, 아니면 풀에 맡기고 (시간 초과 시에도 끝까지 계산돼 캐시를 채움)
+    assets_future = None
+    if _assets_payload['key'] != assets_cache_key():
+        assets_future = _bootstrap_pool().submit(_run_bootstrap_section, 'assets', g.get('db_route'), *args)
+
+    sections = {}
+    for name in BOOTSTRAP_SECTIONS:
+        if name == 'assets':
+            continue
+        try:
+            sections[name] = _section_json(name, known, *_build_bootstrap_section(name, *args))
+        except Exception as e:
+            db.session.rollback()
+            sections[name] = _section_error(name, e)
+
+    try:
+        if assets_future is None:
+            result = _build_bootstrap_section('assets', *args)
+        else:
+            result = assets_future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except TimeoutError:
+        sections['assets'] = b'{"pending":true}'
+    except Exception as e:
+        sections['assets'] = _section_error('assets', e)
+    else:
+        sections['assets'] = _section_json('assets', known, *result)
+
+    parts = [b'"' + name.encode() + b'":' + sections[name] for name in BOOTSTRAP_SECTIONS]
+
+    # 섹션 본문은 이미 직렬화돼 있으므로 다시 파싱하지 않고 이어 붙임
+    head = app.json.dumps({'cursor': cursor, 'year': year, 'month': month}).encode('utf-8')
+    body = head[:-1] + b',"sections":{' + b','.join(parts) + b'}}'
+    return app.response_class(body, mimetype='application/json')
+
+
+@app.route('/api/symbols/search')
+def search_symbols():
+    """종목 자동완성: 종목 마스터 접두사 검색 (심볼·한글/영문 이름·별칭, 외부 호출 없음)"""
+    query = request.args.get('q', '').strip()
+    market = request.args.get('market') or None
+    if market not in (None, 'KR', 'US'):
+        return jsonify({'error': '시장은 KR 또는 US입니다'}), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 30)
+    return jsonify([
+        {'symbol': e.symbol, 'name': e.name, 'market': e.market, 'aliases': list(e.aliases)}
+        for e in get_symbol_index().search(query, limit, market)
+    ])
 
 
 @app.route('/api/stock-price/<symbol>')
 def get_stock_price_api(symbol):
-    """주가 프록시"""
-    price_data = get_stock_price(symbol.upper())
+    """주가 프록시 (호출 예산 최하위: 예산이 모자라면 캐시값, 없으면 503 + Retry-After)"""
+    symbol = symbol.upper()
+    price_data = get_stock_price(symbol, PRIORITY_ADHOC)
     if price_data is None:
+        retry_after = _rate_limiters['finnhub'].retry_after(PRIORITY_ADHOC) if detect_market(symbol) == 'US' else 0
+        if retry_after > 0:
+            resp = jsonify({'error': '요청이 많아 잠시 후 다시 시도해주세요'})
+            resp.headers['Retry-After'] = str(int(retry_after) + 1)
+            return resp, 503
         return jsonify({'error': '주가 조회 실패'}), 500
     return jsonify(price_data)
 
 
+def parse_currency(value):
+    """관리자 입력 통화 코드 검증. 반환: (통화 또는 None, 오류 메시지 또는 None)"""
+    if value is None or not str(value).strip():
+        return None, None
+    currency = str(value).strip().upper()
+    if not (len(currency) == 3 and currency.isalpha()):
+        return None, '통화 코드는 3자리 영문입니다 (예: USD, JPY, EUR)'
+    if get_fx_rate(currency, 'KRW') is None:
+        return None, f'지원하지 않는 통화입니다: {currency}'
+    return currency, None
+
+
+SYMBOL_FORMAT_ERROR = '종목코드 형식이 올바르지 않습니다 (미국: 영문, 한국: 6자리 숫자, 해외: 7203.T 형식)'
+
+
+def is_valid_symbol(symbol):
+    """심볼 형식 검증: 영문(미국), 숫자 6자리(한국), 거래소 접미사 붙은 해외 심볼(7203.T 등)만 허용"""
+    return bool(symbol) and (symbol.isalpha() or (symbol.isdigit() and len(symbol) == 6)
+                             or bool(INTL_SYMBOL_RE.match(symbol)))
+
+
+def log_holding_change(stock):
+    log_change('holding', stock.id, 'upsert', symbol=stock.symbol, name=stock.name, shares=stock.shares,
+               avg_price=stock.avg_price, current_price=stock.current_price, currency=stock.currency)
+
+
 @app.route('/api/admin/stock', methods=['POST'])
 def add_stock():
     """주식 종목 추가 (관리자 전용)"""
@@ -715,9 +2541,12 @@ def add_stock():
     if not symbol or shares <= 0:
         return jsonify({'error': '종목코드와 수량을 올바르게 입력해주세요'}), 400
 
-    # 심볼 형식 검증: 영문(미국) 또는 숫자 6자리(한국)만 허용
-    if not (symbol.isalpha() or (symbol.isdigit() and len(symbol) == 6)):
-        return jsonify({'error': '종목코드 형식이 올바르지 않습니다 (미국: 영문, 한국: 6자리 숫자)'}), 400
+    if not is_valid_symbol(symbol):
+        return jsonify({'error': SYMBOL_FORMAT_ERROR}), 400
+
+    currency, currency_error = parse_currency(data.get('currency'))
+    if currency_error:
+        return jsonify({'error': currency_error}), 400
 
     try:
         avg_price = float(avg_price)
@@ -729,20 +2558,28 @@ def add_stock():
         current_price = 0
 
     # 회사명 조회해서 같이 저장
-    stock_name = get_stock_name(symbol)
+    stock_name = get_stock_name(symbol, PRIORITY_HELD)
+
+    # 해외 종목은 시세 응답의 통화를 저장 (이후 시세 조회 실패 시에도 통화 유지)
+    if currency is None and detect_market(symbol) == 'INTL':
+        currency = (get_stock_price(symbol, PRIORITY_HELD) or {}).get('currency')
 
     stock = StockHolding(
         symbol=symbol, name=stock_name, shares=shares,
         avg_price=avg_price, current_price=current_price,
-        added_by=user_id
+        currency=currency, added_by=user_id
     )
     db.session.add(stock)
+    db.session.flush()
+    log_holding_change(stock)
+    bump_assets_version()
     db.session.commit()
 
     return jsonify({
         'id': stock.id, 'symbol': stock.symbol, 'name': stock.name,
         'shares': stock.shares,
-        'avg_price': stock.avg_price, 'current_price': stock.current_price
+        'avg_price': stock.avg_price, 'current_price': stock.current_price,
+        'currency': stock.currency
     })
 
 
@@ -765,6 +2602,12 @@ def update_stock(stock_id):
     if shares <= 0:
         return jsonify({'error': '수량을 올바르게 입력해주세요'}), 400
 
+    if 'currency' in data:
+        currency, currency_error = parse_currency(data.get('currency'))
+        if currency_error:
+            return jsonify({'error': currency_error}), 400
+        stock.currency = currency
+
     stock.shares = shares
     if avg_price is not None:
         try:
@@ -776,11 +2619,14 @@ def update_stock(stock_id):
             stock.current_price = float(current_price)
         except (ValueError, TypeError):
             pass
+    log_holding_change(stock)
+    bump_assets_version()
     db.session.commit()
 
     return jsonify({
         'id': stock.id, 'symbol': stock.symbol, 'shares': stock.shares,
-        'avg_price': stock.avg_price, 'current_price': stock.current_price
+        'avg_price': stock.avg_price, 'current_price': stock.current_price,
+        'currency': stock.currency
     })
 
 
@@ -797,12 +2643,214 @@ def delete_stock(stock_id):
     if not stock:
         return jsonify({'error': '종목을 찾을 수 없습니다'}), 404
 
+    log_change('holding', stock.id, 'delete', symbol=stock.symbol)
     db.session.delete(stock)
+    bump_assets_version()
     db.session.commit()
 
     return jsonify({'success': True})
 
 
+# 일괄 등록 (증권사 잔고 → 포트폴리오 전체 반영)
+BULK_IMPORT_MAX_ROWS = 200
+BULK_IMPORT_WORKERS = 8
+IMPORT_CASH_SYMBOLS = {'CASH', '현금'}
+# CSV 헤더 별칭 (증권사 내보내기 파일의 한글 헤더 그대로 붙여넣기 가능)
+IMPORT_COLUMN_ALIASES = {
+    'symbol': 'symbol', '종목코드': 'symbol', '티커': 'symbol',
+    'shares': 'shares', '수량': 'shares', '보유수량': 'shares',
+    'avg_price': 'avg_price', '평균단가': 'avg_price', '매입단가': 'avg_price', '구매단가': 'avg_price',
+    'current_price': 'current_price', '현재가': 'current_price',
+    'currency': 'currency', '통화': 'currency',
+}
+
+
+def _parse_number(value, cast=float):
+    """'1,234.5' 같은 입력 허용. 빈 값은 None, 형식 오류는 ValueError"""
+    if value is None:
+        return None
+    text = str(value).replace(',', '').strip()
+    if not text:
+        return None
+    return cast(float(text)) if cast is int else cast(text)
+
+
+def parse_holdings_import(data):
+    """일괄 등록 입력 파싱/검증.
+
+    holdings: [{symbol, shares, avg_price, current_price?, currency?}] 또는
+    csv: 헤더 있는 CSV 문자열 (symbol,shares,avg_price[,current_price,currency] / 한글 헤더 가능).
+    symbol이 CASH(현금)인 행은 shares 열을 현금(원)으로 사용. cash 필드로 따로 줘도 됨.
+    반환: (rows, cash, errors)
+    """
+    if data.get('csv'):
+        reader = csv.DictReader(io.StringIO(data['csv'].strip().lstrip('\ufeff')))
+        items = [{IMPORT_COLUMN_ALIASES.get((k or '').strip().lower(), k): v for k, v in row.items()}
+                 for row in reader]
+    else:
+        items = data.get('holdings') or []
+
+    rows, errors, seen = [], [], set()
+    cash = data.get('cash')
+    if len(items) > BULK_IMPORT_MAX_ROWS:
+        return [], None, [f'한 번에 최대 {BULK_IMPORT_MAX_ROWS}행까지 등록할 수 있습니다']
+
+    for n, item in enumerate(items, start=1):
+        symbol = normalize_symbol(str(item.get('symbol') or '').strip())
+        if symbol.upper() in IMPORT_CASH_SYMBOLS:
+            cash = item.get('shares')
+            continue
+        if not is_valid_symbol(symbol):
+            errors.append(f'{n}행: {SYMBOL_FORMAT_ERROR}')
+            continue
+        if symbol in seen:
+            errors.append(f'{n}행: {symbol} 종목이 중복되었습니다')
+            continue
+        seen.add(symbol)
+        try:
+            shares = _parse_number(item.get('shares'), int)
+            avg_price = _parse_number(item.get('avg_price')) or 0
+            current_price = _parse_number(item.get('current_price'))
+        except (ValueError, TypeError):
+            errors.append(f'{n}행: 숫자 형식이 올바르지 않습니다')
+            continue
+        if not shares or shares <= 0 or avg_price < 0 or (current_price is not None and current_price < 0):
+            errors.append(f'{n}행: 수량/단가를 올바르게 입력해주세요')
+            continue
+        currency, currency_error = parse_currency(item.get('currency'))
+        if currency_error:
+            errors.append(f'{n}행: {currency_error}')
+            continue
+        rows.append({'symbol': symbol, 'shares': shares, 'avg_price': avg_price,
+                     'current_price': current_price, 'currency': currency})
+
+    if cash is not None:
+        try:
+            cash = _parse_number(cash, int)
+        except (ValueError, TypeError):
+            cash = -1
+        if cash is None or cash < 0:
+            errors.append('현금 금액을 올바르게 입력해주세요')
+    return rows, cash, errors
+
+
+def _resolve_symbol(symbol):
+    """워커 스레드에서 종목명 + 시세 조회 (Finnhub 키 조회에 DB가 필요해 앱 컨텍스트 사용)"""
+    with app.app_context():
+        return symbol, get_stock_name(symbol, PRIORITY_HELD), get_stock_price(symbol, PRIORITY_HELD)
+
+
+@app.route('/api/admin/stock/import', methods=['POST'])
+def import_holdings():
+    """보유 종목 일괄 등록 (관리자 전용).
+
+    입력 전체를 먼저 검증하고, 종목명/시세를 병렬로 조회한 뒤 현재 보유 종목과의 차이를
+    한 트랜잭션으로 반영한다. mode=replace(기본)는 목록에 없는 종목을 삭제, merge는 추가/수정만.
+    dry_run=true면 반영하지 않고 변경 내역만 반환.
+    """
+    data = request.get_json()
+    user_id = data.get('user_id')
+    user = db.session.get(User, user_id) if user_id else None
+    if not user or not is_admin(user.name):
+        return jsonify({'error': '권한이 없습니다'}), 403
+
+    mode = data.get('mode', 'replace')
+    if mode not in ('replace', 'merge'):
+        return jsonify({'error': '지원하지 않는 모드입니다 (replace, merge)'}), 400
+    dry_run = bool(data.get('dry_run'))
+
+    rows, cash, errors = parse_holdings_import(data)
+    if errors:
+        return jsonify({'error': f'입력 오류 {len(errors)}건', 'errors': errors}), 400
+    if not rows and cash is None:
+        return jsonify({'error': '등록할 종목이 없습니다'}), 400
+
+    # 외부 조회는 종목 수만큼 직렬로 하면 느리므로 병렬 (결과는 가격/이름 캐시도 데움)
+    resolved = {}
+    if rows:
+        with ThreadPoolExecutor(max_workers=min(BULK_IMPORT_WORKERS, len(rows))) as pool:
+            for symbol, name, price_data in pool.map(_resolve_symbol, [r['symbol'] for r in rows]):
+                resolved[symbol] = (name, price_data)
+
+    existing = {}
+    duplicates = []
+    for stock in StockHolding.query.order_by(StockHolding.id).all():
+        if stock.symbol in existing:
+            duplicates.append(stock)  # 같은 심볼 중복 행은 하나로 정리
+        else:
+            existing[stock.symbol] = stock
+
+    added, updated, unchanged, unresolved = [], [], 0, []
+    changed_stocks = []
+    for row in rows:
+        symbol = row['symbol']
+        name, price_data = resolved.get(symbol, (None, None))
+        if price_data is None:
+            unresolved.append(symbol)
+        currency = row['currency']
+        if currency is None and detect_market(symbol) == 'INTL':
+            currency = (price_data or {}).get('currency')
+
+        stock = existing.get(symbol)
+        if stock is None:
+            stock = StockHolding(
+                symbol=symbol, name=name, shares=row['shares'], avg_price=row['avg_price'],
+                current_price=row['current_price'] or 0, currency=currency, added_by=user_id
+            )
+            db.session.add(stock)
+            added.append(symbol)
+            changed_stocks.append(stock)
+            continue
+
+        before = (stock.shares, stock.avg_price, stock.current_price, stock.currency, stock.name)
+        stock.shares = row['shares']
+        stock.avg_price = row['avg_price']
+        if row['current_price'] is not None:
+            stock.current_price = row['current_price']
+        if currency is not None:
+            stock.currency = currency
+        if name and not stock.name:
+            stock.name = name
+        if before != (stock.shares, stock.avg_price, stock.current_price, stock.currency, stock.name):
+            updated.append(symbol)
+            changed_stocks.append(stock)
+        else:
+            unchanged += 1
+
+    to_delete = list(duplicates)
+    if mode == 'replace':
+        listed = {r['symbol'] for r in rows}
+        to_delete += [s for sym, s in existing.items() if sym not in listed]
+    removed = [s.symbol for s in to_delete]
+
+    if cash is not None:
+        cash_row = CashAsset.query.first()
+        if cash_row:
+            cash_row.amount = cash
+            cash_row.updated_by = user_id
+        else:
+            db.session.add(CashAsset(amount=cash, updated_by=user_id))
+
+    result = {
+        'success': True, 'dry_run': dry_run, 'mode': mode,
+        'added': added, 'updated': updated, 'removed': removed, 'unchanged': unchanged,
+        'cash': cash, 'unresolved': unresolved,
+    }
+    if dry_run:
+        db.session.rollback()
+        return jsonify(result)
+
+    for stock in to_delete:
+        log_change('holding', stock.id, 'delete', symbol=stock.symbol)
+        db.session.delete(stock)
+    db.session.flush()  # 새 종목 id 확정 후 변경 기록
+    for stock in changed_stocks:
+        log_holding_change(stock)
+    bump_assets_version()
+    db.session.commit()
+    return jsonify(result)
+
+
 @app.route('/api/admin/cash', methods=['PUT'])
 def update_cash():
     """현금 자산 수정 (관리자 전용)"""
@@ -828,6 +2876,7 @@ def update_cash():
         cash = CashAsset(amount=amount, updated_by=user_id)
         db.session.add(cash)
 
+    bump_assets_version()
     db.session.commit()
 
     return jsonify({'amount': cash.amount})
@@ -842,10 +2891,11 @@ def get_finnhub_key():
         return jsonify({'error': '권한이 없습니다'}), 403
 
     api_key = get_finnhub_api_key()
+    budget = _rate_limiters['finnhub'].status()  # 워커 공용 호출 예산 (남은 토큰)
     if api_key:
         masked = api_key[:4] + '*' * (len(api_key) - 8) + api_key[-4:] if len(api_key) > 8 else '****'
-        return jsonify({'has_key': True, 'masked_key': masked})
-    return jsonify({'has_key': False, 'masked_key': ''})
+        return jsonify({'has_key': True, 'masked_key': masked, 'budget': budget})
+    return jsonify({'has_key': False, 'masked_key': '', 'budget': budget})
 
 
 @app.route('/api/admin/finnhub-key', methods=['PUT'])
@@ -869,10 +2919,11 @@ def save_finnhub_key():
         config = SiteConfig(key='FINNHUB_API_KEY', value=api_key, updated_by=user_id)
         db.session.add(config)
 
+    bump_assets_version()
     db.session.commit()
 
     # 캐시 초기화
-    _price_cache.clear()
+    clear_price_cache()
 
     return jsonify({'success': True})
 
@@ -891,6 +2942,8 @@ def test_finnhub_key():
         api_key = get_finnhub_api_key()
     if not api_key:
         return jsonify({'success': False, 'message': 'API 키가 없습니다'}), 400
+    if not _rate_limiters['finnhub'].acquire(PRIORITY_PAGE):
+        return jsonify({'success': False, 'message': 'Finnhub 호출 한도 초과: 잠시 후 다시 시도해주세요'})
 
     try:
         resp = http_requests.get(
@@ -933,7 +2986,7 @@ def save_all_settings():
         else:
             config = SiteConfig(key='FINNHUB_API_KEY', value=api_key, updated_by=user_id)
             db.session.add(config)
-        _price_cache.clear()
+        clear_price_cache()
         saved.append('API 키')
 
     # 현금 저장
@@ -953,6 +3006,8 @@ def save_all_settings():
                 db.session.add(cash)
             saved.append('현금 자산')
 
+    if saved:
+        bump_assets_version()
     db.session.commit()
 
     if saved:
@@ -994,20 +3049,157 @@ def delete_user(target_id):
         return jsonify({'error': '관리자는 삭제할 수 없습니다'}), 400
 
     name = target.name
-    PushupRecord.query.filter_by(user_id=target_id).delete()
+    # 기록은 청크 단위로 나눠 커밋 (중간에 실패해도 다시 요청하면 이어서 삭제)
+    delete_records_in_chunks(PushupRecord.user_id == target_id, tombstones=True)
+    for archive in RecordArchive.query.filter_by(user_id=target_id):
+        for d in archive_all_dates(archive):
+            log_change('record', target_id, 'delete', user_id=target_id, date=d)
+        db.session.delete(archive)
+    MonthCompletion.query.filter_by(user_id=target_id).delete()
+    WeekdayCompletion.query.filter_by(user_id=target_id).delete()
+    hand_over_groups(target_id)
+    GroupMember.query.filter_by(user_id=target_id).delete()
+    invalidate_penalty_ledger(target_id)
+    log_change('user', target_id, 'delete')
     db.session.delete(target)
     db.session.commit()
 
     return jsonify({'success': True, 'message': f'{name} 삭제 완료'})
 
 
+EXPORT_CHUNK_ROWS = 1000
+
+
+@app.route('/api/admin/export')
+@read_replica
+def export_records():
+    """체크 기록 일괄 내보내기 (관리자 전용).
+
+    ?start=YYYY-MM-DD&end=YYYY-MM-DD&format=csv|ndjson
+    서버 사이드 커서(yield_per)로 EXPORT_CHUNK_ROWS씩 읽어 바로 흘려보내므로
+    기록이 아무리 많아도 메모리 사용량이 일정하다. Content-Length 없이 청크 전송된다.
+    압축된 연도는 압축본에서 펼쳐 먼저 내보낸다 (created_at 없음).
+    """
+    user_id = request.args.get('user_id', type=int)
+    user = db.session.get(User, user_id) if user_id else None
+    if not user or not is_admin(user.name):
+        return jsonify({'error': '권한이 없습니다'}), 403
+
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'error': '지원하지 않는 형식입니다 (csv, ndjson)'}), 400
+
+    try:
+        start_date = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if request.args.get('start') else None
+        end_date = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if request.args.get('end') else None
+    except ValueError:
+        return jsonify({'error': '날짜 형식이 올바르지 않습니다'}), 400
+
+    stmt = db.select(
+        User.name, PushupRecord.date, PushupRecord.completed, PushupRecord.created_at
+    ).join(User, User.id == PushupRecord.user_id).order_by(PushupRecord.date, PushupRecord.id)
+    if start_date:
+        stmt = stmt.where(PushupRecord.date >= start_date)
+    if end_date:
+        stmt = stmt.where(PushupRecord.date <= end_date)
+    stmt = stmt.execution_options(stream_results=True, yield_per=EXPORT_CHUNK_ROWS)
+
+    def archived_rows():
+        """압축된 연도(항상 원본 기록보다 이전 연도)를 연도·유저 순으로, 압축본 한 행씩 펼쳐 날짜순으로
+
+        압축이 중간에 끊기면 같은 날짜가 원본에도 남아 있으므로, 그 날짜는 원본 쪽에서만 내보낸다.
+        """
+        archives = db.select(User.name, RecordArchive.user_id, RecordArchive.year, RecordArchive.bits).join(
+            User, User.id == RecordArchive.user_id).order_by(RecordArchive.year, RecordArchive.user_id)
+        if start_date:
+            archives = archives.where(RecordArchive.year >= start_date.year)
+        if end_date:
+            archives = archives.where(RecordArchive.year <= end_date.year)
+        for archive in db.session.execute(archives.execution_options(yield_per=EXPORT_CHUNK_ROWS)):
+            live = {d for (d,) in db.session.query(PushupRecord.date).filter(
+                PushupRecord.user_id == archive.user_id,
+                PushupRecord.date >= date(archive.year, 1, 1),
+                PushupRecord.date <= date(archive.year, 12, 31))}
+            rows = [(archive.name, d, True, None) for d in sorted(archive_all_dates(archive))
+                    if d not in live and (not start_date or d >= start_date) and (not end_date or d <= end_date)]
+            if rows:
+                yield rows
+
+    def generate():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        if fmt == 'csv':
+            writer.writerow(['user', 'date', 'completed', 'created_at'])
+        results = []
+
+        def record_rows():
+            # 압축본을 다 내보낸 뒤에 서버 사이드 커서를 연다
+            results.append(db.session.execute(stmt))
+            yield from results[0].partitions()
+
+        try:
+            for rows in itertools.chain(archived_rows(), record_rows()):
+                for name, d, completed, created_at in rows:
+                    created = created_at.isoformat() if created_at else ''
+                    if fmt == 'csv':
+                        writer.writerow([name, d.isoformat(), int(bool(completed)), created])
+                    else:
+                        buf.write(json.dumps({
+                            'user': name, 'date': d.isoformat(),
+                            'completed': bool(completed), 'created_at': created,
+                        }, ensure_ascii=False))
+                        buf.write('\n')
+                # 청크 단위로 내보내고 버퍼 비우기
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate(0)
+            if buf.tell():
+                yield buf.getvalue()
+        finally:
+            for result in results:
+                result.close()
+
+    suffix = f"{start_date or 'all'}_{end_date or 'all'}"
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename=pushup_records_{suffix}.{fmt}',
+            'Cache-Control': 'no-store',
+        },
+    )
+
+
+@app.route('/api/admin/archive', methods=['POST'])
+def archive_records():
+    """마감된 연도 기록을 연간 압축본으로 옮김 (관리자 전용, CLI: flask archive-records)"""
+    data = request.get_json()
+    user_id = data.get('user_id')
+    user = db.session.get(User, user_id) if user_id else None
+    if not user or not is_admin(user.name):
+        return jsonify({'error': '권한이 없습니다'}), 403
+
+    archived = archive_closed_years(data.get('before_year'))
+    return jsonify({
+        'success': True,
+        'archived': [{'year': y, 'user_id': uid, 'rows': n} for y, uid, n in archived],
+        'rows': sum(n for _, _, n in archived),
+    })
+
+
 @app.route('/api/event')
+@read_replica
 def get_active_event():
     """현재 활성 이벤트 조회"""
-    user_id = request.args.get('user_id', type=int)
+    return jsonify(build_event_payload(request.args.get('user_id', type=int)))
+
+
+def build_event_payload(user_id):
+    """활성 이벤트 응답 본문 (/api/event, /api/bootstrap 공용)"""
     event = Event.query.filter_by(is_active=True).order_by(Event.created_at.desc()).first()
     if not event:
-        return jsonify({'event': None})
+        return {'event': None}
 
     today = today_kst()
     delta = (event.target_date - today).days
@@ -1022,7 +3214,7 @@ def get_active_event():
             if user_id and u.id == user_id:
                 my_joined = True
 
-    return jsonify({
+    return {
         'event': {
             'id': event.id,
             'title': event.title,
@@ -1033,7 +3225,7 @@ def get_active_event():
             'participants': participants,
             'my_joined': my_joined,
         }
-    })
+    }
 
 
 @app.route('/api/event/join', methods=['POST'])
@@ -1056,6 +3248,8 @@ def join_event():
 
     participant = EventParticipant(event_id=event_id, user_id=user_id)
     db.session.add(participant)
+    db.session.flush()
+    log_change('participant', participant.id, 'upsert', event_id=event_id, user_id=user_id)
     db.session.commit()
 
     return jsonify({'success': True})
@@ -1075,6 +3269,7 @@ def leave_event():
     if not participant:
         return jsonify({'error': '참석 기록이 없습니다'}), 404
 
+    log_change('participant', participant.id, 'delete', event_id=event_id, user_id=user_id)
     db.session.delete(participant)
     db.session.commit()
 
@@ -1102,10 +3297,14 @@ def save_event():
         return jsonify({'error': '날짜 형식이 올바르지 않습니다'}), 400
 
     # 기존 활성 이벤트가 있으면 비활성화
+    for (old_id,) in db.session.query(Event.id).filter_by(is_active=True):
+        log_change('event', old_id, 'upsert', is_active=False)
     Event.query.filter_by(is_active=True).update({'is_active': False})
 
     event = Event(title=title, target_date=target_date, created_by=user_id)
     db.session.add(event)
+    db.session.flush()
+    log_change('event', event.id, 'upsert', title=title, target_date=target_date, is_active=True)
     db.session.commit()
 
     return jsonify({'success': True, 'id': event.id})
@@ -1124,6 +3323,8 @@ def delete_event(event_id):
     if not event:
         return jsonify({'error': '이벤트를 찾을 수 없습니다'}), 404
 
+    # 참석자는 cascade로 함께 삭제 → 이벤트 톰스톤 하나로 대신함
+    log_change('event', event.id, 'delete')
     db.session.delete(event)
     db.session.commit()
 
@@ -1131,8 +3332,22 @@ def delete_event(event_id):
 
 
 # DB 테이블 생성 + 마이그레이션
-with app.app_context():
+# import 시점이 아니라 gunicorn 마스터(gunicorn.conf.py when_ready) 또는 첫 요청에서 한 번 실행
+_db_ready = False
+_db_ready_lock = threading.Lock()
+
+
+def init_db():
+    """테이블 생성 + 컬럼 추가 마이그레이션"""
     db.create_all()
+    # 월 완료 비트마스크가 비어 있는데 기록이 있으면 (테이블 신규 생성) 한 번 채움
+    if (db.session.query(MonthCompletion.id).first() is None
+            and (db.session.query(PushupRecord.id).first() or db.session.query(RecordArchive.id).first())):
+        rebuild_month_completions()
+    # 요일 카운터 테이블 신규 생성이면 월 비트마스크로 한 번 채움
+    elif (db.session.query(WeekdayCompletion.id).first() is None
+            and db.session.query(MonthCompletion.id).first() is not None):
+        rebuild_weekday_completions()
     # avg_price 컬럼 추가 (기존 DB에 컬럼이 없는 경우)
     try:
         db.session.execute(db.text(
@@ -1157,6 +3372,345 @@ with app.app_context():
         db.session.commit()
     except Exception:
         db.session.rollback()
+    # currency 컬럼 추가 (종목별 통화, NULL이면 시장 기본 통화)
+    try:
+        db.session.execute(db.text(
+            "ALTER TABLE stock_holdings ADD COLUMN currency VARCHAR(3)"
+        ))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+    # 연속 달성 컬럼 추가 — 새로 추가된 경우 기존 기록으로 한 번 채움
+    try:
+        db.session.execute(db.text("ALTER TABLE users ADD COLUMN current_streak INTEGER NOT NULL DEFAULT 0"))
+        db.session.execute(db.text("ALTER TABLE users ADD COLUMN best_streak INTEGER NOT NULL DEFAULT 0"))
+        db.session.execute(db.text("ALTER TABLE users ADD COLUMN last_completed_workday DATE"))
+        db.session.commit()
+        for u in User.query.all():
+            rebuild_user_streak(u)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+
+def ensure_db_ready():
+    """스키마 점검을 프로세스당 한 번만 실행"""
+    global _db_ready
+    if _db_ready:
+        return
+    with _db_ready_lock:
+        if _db_ready:
+            return
+        with app.app_context():
+            init_db()
+        _db_ready = True
+
+
+@app.before_request
+def _ensure_db_ready_before_request():
+    if not _db_ready:
+        ensure_db_ready()
+
+
+# 요청 샘플링 프로파일러 (관리자가 켜고 끔, 설정은 SiteConfig PROFILER_CONFIG에 JSON)
+PROFILER_DEFAULTS = {
+    'enabled': False,
+    'sample_rate': 0.0,        # 무작위로 프로파일할 요청 비율 (0~1)
+    'route': '',               # 이 정규식에 맞는 경로는 항상 프로파일
+    'header': 'X-Profile',     # 이 헤더가 붙은 요청은 항상 프로파일
+    'interval_ms': 5,          # 스택 샘플링 간격
+    'keep': 50,                # 보관할 최근 프로파일 수
+}
+PROFILER_CONFIG_TTL = 10  # 다른 워커의 설정 변경 반영 주기 (초)
+_profiler_config = {'config': None, 'loaded_at': 0.0}
+
+
+def get_profiler_config():
+    now = time.monotonic()
+    if _profiler_config['config'] is not None and now - _profiler_config['loaded_at'] < PROFILER_CONFIG_TTL:
+        return _profiler_config['config']
+    config = dict(PROFILER_DEFAULTS)
+    row = SiteConfig.query.filter_by(key='PROFILER_CONFIG').first()
+    if row and row.value:
+        try:
+            config.update(json.loads(row.value))
+        except ValueError:
+            pass
+    _profiler_config.update(config=config, loaded_at=now)
+    return config
+
+
+def _should_profile(config):
+    if not config['enabled'] or request.path.startswith(('/static/', '/api/admin/profiler')):
+        return False
+    if config['header'] and request.headers.get(config['header']):
+        return True
+    if config['route'] and re.search(config['route'], request.path):
+        return True
+    return secrets.randbelow(10_000) < config['sample_rate'] * 10_000
+
+
+@app.before_request
+def start_request_profile():
+    """프로파일 대상 요청이면 이 스레드 스택 샘플링 + 쿼리 수 집계 시작"""
+    config = get_profiler_config()
+    if not _should_profile(config):
+        return
+    profiling.start_query_count()
+    g.profiler = profiling.StackSampler(threading.get_ident(), config['interval_ms'] / 1000).start()
+
+
+@app.after_request
+def finish_request_profile(response):
+    """샘플링을 멈추고 프로파일을 별도 연결로 저장 (스트리밍 응답은 뷰 반환 시점까지만 측정)"""
+    sampler = g.pop('profiler', None)
+    if sampler is None:
+        return response
+    sampler.stop()
+    query_count = profiling.stop_query_count()
+    keep = max(1, int(get_profiler_config()['keep']))
+    table = RequestProfile.__table__
+    try:
+        with db.engine.begin() as conn:
+            result = conn.execute(table.insert().values(
+                method=request.method, path=request.path[:300], endpoint=request.endpoint,
+                status=response.status_code, duration_ms=round(sampler.duration * 1000, 1),
+                query_count=query_count, samples=sampler.samples,
+                http_ms=sampler.blocked_ms(profiling.HTTP_MODULE_PREFIXES),
+                sql_ms=sampler.blocked_ms(profiling.SQL_MODULE_PREFIXES),
+                stacks=sampler.collapsed(), created_at=datetime.utcnow(),
+            ))
+            conn.execute(table.delete().where(table.c.id <= result.inserted_primary_key[0] - keep))
+    except Exception as e:
+        app.logger.warning('프로파일 저장 실패: %s', e)
+    return response
+
+
+@app.route('/api/admin/profiler', methods=['GET', 'PUT'])
+def profiler_settings():
+    """프로파일러 설정 조회/변경 + 최근 프로파일 목록 (관리자 전용)"""
+    data = (request.get_json(silent=True) or {}) if request.method == 'PUT' else {}
+    user_id = data.get('user_id') or request.args.get('user_id', type=int)
+    user = db.session.get(User, user_id) if user_id else None
+    if not user or not is_admin(user.name):
+        return jsonify({'error': '권한이 없습니다'}), 403
+
+    if request.method == 'PUT':
+        config = dict(get_profiler_config())
+        try:
+            for key, default in PROFILER_DEFAULTS.items():
+                if key in data:
+                    config[key] = type(default)(data[key])
+            if config['route']:
+                re.compile(config['route'])
+        except (TypeError, ValueError, re.error):
+            return jsonify({'error': '프로파일러 설정 값이 올바르지 않습니다'}), 400
+        config['sample_rate'] = min(max(config['sample_rate'], 0.0), 1.0)
+        config['interval_ms'] = min(max(config['interval_ms'], 1), 100)
+        config['keep'] = min(max(config['keep'], 1), 500)
+        row = SiteConfig.query.filter_by(key='PROFILER_CONFIG').first()
+        if row:
+            row.value = json.dumps(config)
+        else:
+            db.session.add(SiteConfig(key='PROFILER_CONFIG', value=json.dumps(config)))
+        db.session.commit()
+        _profiler_config.update(config=config, loaded_at=time.monotonic())
+
+    profiles = (db.session.query(RequestProfile.id, RequestProfile.method, RequestProfile.path,
+                                 RequestProfile.status, RequestProfile.duration_ms,
+                                 RequestProfile.query_count, RequestProfile.samples,
+                                 RequestProfile.http_ms, RequestProfile.sql_ms, RequestProfile.created_at)
+                .order_by(RequestProfile.id.desc()).all())
+    return jsonify({
+        'config': get_profiler_config(),
+        'profiles': [{
+            'id': p.id, 'method': p.method, 'path': p.path, 'status': p.status,
+            'duration_ms': p.duration_ms, 'query_count': p.query_count, 'samples': p.samples,
+            'http_ms': p.http_ms, 'sql_ms': p.sql_ms,
+            'created_at': p.created_at.isoformat() + 'Z' if p.created_at else None,
+        } for p in profiles],
+    })
+
+
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '200'))  # 0이면 끔
+SLOW_QUERY_FLUSH_INTERVAL = 10  # 워커 메모리 집계를 DB에 누적하는 주기 (초)
+slow_query_log = profiling.SlowQueryLog(SLOW_QUERY_MS).install() if SLOW_QUERY_MS > 0 else None
+_slow_query_flushed_at = 0.0
+
+
+def flush_slow_queries():
+    """워커에 쌓인 느린 쿼리 집계를 slow_queries 테이블에 더함 (지문별 upsert)"""
+    global _slow_query_flushed_at
+    _slow_query_flushed_at = time.monotonic()
+    if slow_query_log is None:
+        return
+    pending = slow_query_log.drain()
+    if not pending:
+        return
+    table = SlowQuery.__table__
+    now = datetime.utcnow()
+    with slow_query_log.paused(), db.engine.begin() as conn:
+        for fingerprint, entry in pending.items():
+            updated = conn.execute(table.update().where(table.c.fingerprint == fingerprint).values(
+                count=table.c.count + entry['count'],
+                total_ms=table.c.total_ms + entry['total_ms'],
+                max_ms=db.case((table.c.max_ms < entry['max_ms'], entry['max_ms']), else_=table.c.max_ms),
+                plan=db.func.coalesce(table.c.plan, entry['plan']),
+                last_seen=now,
+            )).rowcount
+            if not updated:
+                conn.execute(table.insert().values(
+                    fingerprint=fingerprint, statement=entry['statement'], count=entry['count'],
+                    total_ms=entry['total_ms'], max_ms=entry['max_ms'], plan=entry['plan'],
+                    first_seen=now, last_seen=now,
+                ))
+
+
+@app.after_request
+def flush_slow_queries_after_request(response):
+    if slow_query_log is not None and time.monotonic() - _slow_query_flushed_at >= SLOW_QUERY_FLUSH_INTERVAL:
+        try:
+            flush_slow_queries()
+        except Exception as e:
+            app.logger.warning('느린 쿼리 로그 저장 실패: %s', e)
+    return response
+
+
+@app.route('/api/admin/slow-queries', methods=['GET', 'DELETE'])
+def slow_queries():
+    """느린 쿼리 지문별 통계 (총 소요 시간 순, 관리자 전용). DELETE는 초기화"""
+    data = (request.get_json(silent=True) or {}) if request.method == 'DELETE' else {}
+    user_id = data.get('user_id') or request.args.get('user_id', type=int)
+    user = db.session.get(User, user_id) if user_id else None
+    if not user or not is_admin(user.name):
+        return jsonify({'error': '권한이 없습니다'}), 403
+
+    flush_slow_queries()
+    if request.method == 'DELETE':
+        if slow_query_log is not None:
+            slow_query_log.reset()
+        SlowQuery.query.delete()
+        db.session.commit()
+        return jsonify({'success': True})
+
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    rows = SlowQuery.query.order_by(SlowQuery.total_ms.desc()).limit(limit).all()
+    return jsonify({
+        'threshold_ms': SLOW_QUERY_MS,
+        'queries': [{
+            'fingerprint': q.fingerprint, 'statement': q.statement, 'count': q.count,
+            'total_ms': round(q.total_ms, 1), 'avg_ms': round(q.total_ms / q.count, 1) if q.count else 0,
+            'max_ms': round(q.max_ms, 1), 'plan': q.plan,
+            'first_seen': q.first_seen.isoformat() + 'Z' if q.first_seen else None,
+            'last_seen': q.last_seen.isoformat() + 'Z' if q.last_seen else None,
+        } for q in rows],
+    })
+
+
+@app.route('/api/admin/profiler/<int:profile_id>')
+def download_profile(profile_id):
+    """프로파일 collapsed stack 다운로드 (flamegraph.pl, speedscope 입력 형식, 관리자 전용)"""
+    user_id = request.args.get('user_id', type=int)
+    user = db.session.get(User, user_id) if user_id else None
+    if not user or not is_admin(user.name):
+        return jsonify({'error': '권한이 없습니다'}), 403
+
+    profile = db.session.get(RequestProfile, profile_id)
+    if not profile:
+        return jsonify({'error': '프로파일을 찾을 수 없습니다'}), 404
+    return Response(profile.stacks, mimetype='text/plain', headers={
+        'Content-Disposition': f'attachment; filename=profile_{profile.id}.collapsed',
+    })
+
+
+def warm_up():
+    """gunicorn preload 시 마스터에서 미리 데워 두는 항목 (fork 후 워커가 공유)"""
+    ensure_db_ready()
+    kr_holidays = get_kr_holidays()
+    today = today_kst()
+    nyse_holidays = get_nyse_holidays()
+    for y in (today.year - 1, today.year, today.year + 1):
+        date(y, 1, 1) in kr_holidays  # 조회 시 해당 연도 공휴일 테이블 생성
+        date(y, 1, 1) in nyse_holidays
+    market_timezone('US')
+    get_symbol_index()
+    with app.app_context():
+        load_warm_cache()
+    app.wsgi_app.load()
+    get_http_session()  # requests import (세션 자체는 워커 pid별로 다시 생성)
+
+
+# 개장 워밍업: 휴장 중엔 시세를 다음 개장까지 캐시하므로 개장 순간 첫 방문자가 전 종목 조회를
+# 떠안지 않게, 개장 직후(동시호가 체결가가 시세에 반영될 몇 초 뒤) 자산 응답을 미리 만든다.
+# 워커마다 스레드가 돌지만 get_assets_body의 파일 잠금으로 실제 조회는 한 워커만 한다.
+QUOTE_WARMUP_DELAY = 10
+_quote_warmer = {'pid': None}
+
+
+def warm_market_open():
+    with app.app_context():
+        get_assets_body(assets_cache_key())
+
+
+def _run_quote_warmer():
+    while True:
+        now = datetime.now(timezone.utc)
+        open_at = min(next_market_open(m, now) for m in MARKET_SESSIONS)
+        time.sleep((open_at - now).total_seconds() + QUOTE_WARMUP_DELAY)
+        try:
+            warm_market_open()
+        except Exception as e:
+            app.logger.warning('개장 워밍업 실패: %s', e)
+
+
+def start_quote_warmer():
+    """워커 프로세스에서 개장 워밍업 스레드 시작 (gunicorn.conf.py post_fork)"""
+    if _quote_warmer['pid'] == os.getpid():
+        return
+    _quote_warmer['pid'] = os.getpid()
+    threading.Thread(target=_run_quote_warmer, name='quote-warmer', daemon=True).start()
+
+
+@app.cli.command('refresh-symbols')
+def refresh_symbols_command():
+    """KIND 상장법인 목록 + nasdaqtrader 심볼 디렉터리로 종목 마스터 갱신 (기존 별칭·ETF 행은 유지)"""
+    session = get_http_session()
+    try:
+        kind = session.get(KIND_LIST_URL, headers=_UA_HEADERS, timeout=30)
+        kr = parse_kind_listing(kind.content.decode('euc-kr', errors='replace'))
+        us = (parse_nasdaq_directory(session.get(NASDAQ_LISTED_URL, timeout=30).text, 'Symbol')
+              + parse_nasdaq_directory(session.get(OTHER_LISTED_URL, timeout=30).text, 'ACT Symbol'))
+    except Exception as e:
+        raise click.ClickException(f'목록 다운로드 실패: {e} (기존 파일 유지)')
+    if not kr or not us:
+        raise click.ClickException('목록 형식을 읽지 못했습니다 (기존 파일 유지)')
+
+    existing = {e.symbol: e for e in read_symbols(SYMBOLS_FILE)} if os.path.exists(SYMBOLS_FILE) else {}
+    merged = dict(existing)
+    for market, rows in (('KR', kr), ('US', us)):
+        for symbol, name in rows:
+            old = existing.get(symbol)
+            merged[symbol] = SymbolEntry(symbol, name, market, old.aliases if old else ())
+    write_symbols(SYMBOLS_FILE, merged.values())
+    click.echo(f'KR {len(kr)} · US {len(us)} → 총 {len(merged)}종목 ({SYMBOLS_FILE})')
+
+
+@app.cli.command('rebuild-month-masks')
+def rebuild_month_masks_command():
+    """원본 기록 + 연도 압축본으로 월 완료 비트마스크 재생성"""
+    ensure_db_ready()
+    click.echo(f'{rebuild_month_completions()}개 유저×월 마스크 재생성 (요일 카운터 포함)')
+
+
+@app.cli.command('archive-records')
+@click.option('--before-year', type=int, default=None, help='이 연도 이전만 압축 (기본: 올해 이전 전체)')
+def archive_records_command(before_year):
+    """마감된 연도의 체크 기록을 유저×연도 압축본으로 옮기고 원본 행 삭제"""
+    ensure_db_ready()
+    archived = archive_closed_years(before_year)
+    for year, uid, moved in archived:
+        click.echo(f'{year} user={uid}: {moved} rows')
+    click.echo(f'총 {sum(n for _, _, n in archived)}행 압축')
 
 
 if __name__ == '__main__':
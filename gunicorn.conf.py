@@ -0,0 +1,24 @@
+"""gunicorn 설정 (gunicorn이 작업 디렉터리의 이 파일을 자동으로 읽음)
+
+preload_app: 마스터가 app을 한 번 import + warm_up() 한 뒤 워커를 fork한다.
+스키마 점검·공휴일 테이블·requests import 비용을 마스터가 한 번만 치르고,
+워커는 fork 직후 바로 요청을 받는다 (Render 무료 플랜 콜드 스타트 대응).
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+preload_app = True
+
+
+def when_ready(server):
+    import app
+    app.warm_up()
+
+
+def post_fork(server, worker):
+    # 마스터에서 열린 DB 커넥션을 워커가 공유하지 않도록 풀만 비움 (소켓은 닫지 않음)
+    import app
+    with app.app.app_context():
+        for engine in app.db.engines.values():
+            engine.dispose(close=False)
+    app.start_quote_warmer()
@@ -1,7 +1,37 @@
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from datetime import datetime
 
-db = SQLAlchemy()
+
+class RoutingSession(Session):
+    """읽기 전용 요청(g.db_route == 'replica')의 조회를 replica 바인드로 보내는 세션.
+
+    flush(쓰기)는 항상 primary로 가고, 한 번이라도 쓴 세션은 이후 조회도 primary에 고정한다.
+    replica 바인드가 설정되지 않았으면 기본 동작과 같다.
+    """
+
+    def __init__(self, db, **kwargs):
+        super().__init__(db, **kwargs)
+        self._wrote = False
+
+    def flush(self, objects=None):
+        # autoflush는 조회마다 호출되므로 실제 변경이 있을 때만 primary 고정
+        if self.new or self.dirty or self.deleted:
+            self._wrote = True
+        super().flush(objects)
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        is_dml = clause is not None and getattr(clause, 'is_dml', False)
+        if (bind is None and not self._flushing and not self._wrote and not is_dml
+                and has_app_context() and g.get('db_route') == 'replica'):
+            engine = self._db.engines.get('replica')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
 class User(db.Model):
@@ -12,6 +42,11 @@ class User(db.Model):
     name = db.Column(db.String(100), unique=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # 연속 달성 (토글 시 증분 갱신, 평일 기준)
+    current_streak = db.Column(db.Integer, nullable=False, default=0)  # last_completed_workday에서 끝나는 연속 평일 수
+    best_streak = db.Column(db.Integer, nullable=False, default=0)
+    last_completed_workday = db.Column(db.Date, nullable=True)
+
     # 관계 설정
     records = db.relationship('PushupRecord', backref='user', lazy=True)
 
@@ -48,6 +83,7 @@ class StockHolding(db.Model):
     shares = db.Column(db.Integer, nullable=False)
     avg_price = db.Column(db.Float, nullable=False, default=0)
     current_price = db.Column(db.Float, nullable=False, default=0)  # KR 주식용 수동 입력 현재가
+    currency = db.Column(db.String(3), nullable=True)  # 통화 (NULL이면 시장 기본값: KR=KRW, US=USD, 해외=시세 통화)
     added_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -111,3 +147,205 @@ class EventParticipant(db.Model):
     __table_args__ = (
         db.UniqueConstraint('event_id', 'user_id', name='unique_event_user'),
     )
+
+
+class PenaltyLedger(db.Model):
+    """마감된 월의 유저별 벌금 확정 기록 (지난달은 원본 기록 재계산 없이 이 값을 사용)"""
+    __tablename__ = 'penalty_ledger'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    penalty = db.Column(db.Integer, nullable=False, default=0)
+    missed_days = db.Column(db.Integer, nullable=False, default=0)
+    completed_days = db.Column(db.Integer, nullable=False, default=0)
+    total_workdays = db.Column(db.Integer, nullable=False, default=0)
+    first_check_at = db.Column(db.DateTime, nullable=True)  # 랭킹 동점자 정렬용 (그 달 첫 체크 시각)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'year', 'month', name='unique_user_year_month'),
+        db.Index('ix_penalty_ledger_year_month', 'year', 'month'),
+    )
+
+    def __repr__(self):
+        return f'<PenaltyLedger {self.user_id} {self.year}-{self.month}>'
+
+
+class ChallengeGroup(db.Model):
+    """챌린지 그룹 (친구 모임 단위)"""
+    __tablename__ = 'challenge_groups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    invite_code = db.Column(db.String(6), unique=True, nullable=False)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    members = db.relationship('GroupMember', backref='group', lazy=True, cascade='all, delete-orphan')
+
+    def __repr__(self):
+        return f'<ChallengeGroup {self.name}>'
+
+
+class GroupMember(db.Model):
+    """그룹 멤버십 (role: admin | member)"""
+    __tablename__ = 'group_members'
+
+    id = db.Column(db.Integer, primary_key=True)
+    group_id = db.Column(db.Integer, db.ForeignKey('challenge_groups.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    role = db.Column(db.String(20), nullable=False, default='member')
+    joined_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # unique(group_id, user_id)가 그룹별 멤버 조회 인덱스를 겸하고, user_id 인덱스는 내 그룹 목록용
+    __table_args__ = (
+        db.UniqueConstraint('group_id', 'user_id', name='unique_group_user'),
+        db.Index('ix_group_members_user_id', 'user_id'),
+    )
+
+
+class ChangeLog(db.Model):
+    """델타 동기화용 변경 기록. id가 단조 증가 버전(커서)이고, 삭제는 op='delete' 톰스톤으로 남김.
+
+    entity: record | holding | participant | event | user
+    record는 원본 행이 압축본으로 옮겨질 수 있어 (user_id, date)로 식별한다 (entity_id = user_id, data에 date).
+    """
+    __tablename__ = 'change_log'
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # upsert | delete
+    data = db.Column(db.Text, nullable=False, default='{}')  # 클라이언트가 캐시를 고치는 데 필요한 최소 필드 (JSON)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # 정리(prune) 후에도 id를 재사용하지 않도록 (SQLite 기본 rowid는 최댓값 삭제 시 재사용)
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    def __repr__(self):
+        return f'<ChangeLog {self.id} {self.entity}:{self.entity_id} {self.op}>'
+
+
+class RecordArchive(db.Model):
+    """마감된 연도의 체크 기록 압축본 (유저×연도 1행). 옮겨 온 pushup_records 원본 행은 삭제된다.
+
+    bits: 그 해 1월 1일부터의 일자 인덱스별 완료 비트 (366비트, little-endian)
+    """
+    __tablename__ = 'record_archives'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    bits = db.Column(db.LargeBinary(46), nullable=False)
+    completed_days = db.Column(db.Integer, nullable=False, default=0)
+    month_counts = db.Column(db.String(60), nullable=False, default='[]')  # 월별 완료 수 (JSON 12개)
+    first_checks = db.Column(db.Text, nullable=False, default='{}')  # 월별 첫 체크 시각 (랭킹 동점자 정렬용, JSON)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'year', name='unique_archive_user_year'),
+    )
+
+    def __repr__(self):
+        return f'<RecordArchive {self.user_id} {self.year}>'
+
+
+class MonthCompletion(db.Model):
+    """유저×월 완료 비트마스크 (bit d-1 = d일 완료). pushup_records/record_archives와 토글 시 함께 갱신.
+    캘린더는 이 한 행으로, 랭킹은 popcount(mask & 평일 마스크)로 계산한다.
+    """
+    __tablename__ = 'month_completions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    mask = db.Column(db.Integer, nullable=False, default=0)
+    first_check_at = db.Column(db.DateTime, nullable=True)  # 그 달 첫 체크 시각 (랭킹 동점자 정렬용, 모두 취소하면 초기화)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'year', 'month', name='unique_completion_user_year_month'),
+        db.Index('ix_month_completions_year_month', 'year', 'month'),
+    )
+
+    def __repr__(self):
+        return f'<MonthCompletion {self.user_id} {self.year}-{self.month} {self.mask:#x}>'
+
+
+class WeekdayCompletion(db.Model):
+    """유저×요일 완료 평일 수 (weekday 0=월 … 4=금). 월 비트마스크와 함께 토글 시 증감.
+    분석 화면의 요일별 히트맵이 기간과 무관하게 유저당 5행으로 끝나도록 유지하는 집계.
+    """
+    __tablename__ = 'weekday_completions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    weekday = db.Column(db.Integer, nullable=False)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'weekday', name='unique_weekday_completion_user_weekday'),
+    )
+
+    def __repr__(self):
+        return f'<WeekdayCompletion {self.user_id} {self.weekday} {self.completed}>'
+
+
+class MarketCacheEntry(db.Model):
+    """시세·종목명·환율 영구 캐시 (warm_cache.py). 재시작 후 메모리 캐시를 다시 채우는 데 사용"""
+    __tablename__ = 'market_cache'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)  # price | name | fx
+    key = db.Column(db.String(40), nullable=False)
+    fetched_at = db.Column(db.Float, nullable=False)
+    expires_at = db.Column(db.Float, nullable=True)
+    value = db.Column(db.Text, nullable=False)  # JSON
+
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'key', name='unique_market_cache_kind_key'),
+    )
+
+    def __repr__(self):
+        return f'<MarketCacheEntry {self.kind}:{self.key}>'
+
+
+class RequestProfile(db.Model):
+    """샘플링 프로파일러가 남긴 요청별 프로파일 (최근 N개만 유지)"""
+    __tablename__ = 'request_profiles'
+
+    id = db.Column(db.Integer, primary_key=True)
+    method = db.Column(db.String(10), nullable=False)
+    path = db.Column(db.String(300), nullable=False)
+    endpoint = db.Column(db.String(100), nullable=True)
+    status = db.Column(db.Integer, nullable=True)
+    duration_ms = db.Column(db.Float, nullable=False, default=0)
+    query_count = db.Column(db.Integer, nullable=False, default=0)
+    samples = db.Column(db.Integer, nullable=False, default=0)
+    http_ms = db.Column(db.Float, nullable=False, default=0)  # 외부 HTTP 대기 추정
+    sql_ms = db.Column(db.Float, nullable=False, default=0)  # SQLAlchemy/DB 대기 추정
+    stacks = db.Column(db.Text, nullable=False, default='')  # collapsed stack ("a;b;c count" 줄 단위)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<RequestProfile {self.method} {self.path} {self.duration_ms:.0f}ms>'
+
+
+class SlowQuery(db.Model):
+    """임계값 이상 걸린 쿼리의 지문별 누적 통계 + 처음 느려졌을 때의 실행 계획"""
+    __tablename__ = 'slow_queries'
+
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(16), unique=True, nullable=False)
+    statement = db.Column(db.Text, nullable=False)  # 리터럴/파라미터를 ?로 정규화한 SQL
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total_ms = db.Column(db.Float, nullable=False, default=0)
+    max_ms = db.Column(db.Float, nullable=False, default=0)
+    plan = db.Column(db.Text, nullable=True)  # EXPLAIN 결과
+    first_seen = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SlowQuery {self.fingerprint} x{self.count}>'
@@ -0,0 +1,208 @@
+"""요청 단위 샘플링 프로파일러: 실행 중인 요청 스레드의 스택을 주기적으로 찍어 collapsed stack으로 집계.
+
+CPU 시간이 아니라 벽시계 기준 샘플링이라 http_requests.get 대기(소켓 read)나
+SQLAlchemy 쿼리 대기처럼 블로킹된 시간도 그대로 잡힌다.
+결과는 flamegraph.pl / speedscope에 바로 넣을 수 있는 "frame;frame;frame count" 텍스트.
+"""
+import hashlib
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MAX_STACK_DEPTH = 128
+
+# 블로킹 요약용: 이 모듈 접두사 프레임이 스택에 있으면 해당 대기로 분류
+HTTP_MODULE_PREFIXES = ('requests.', 'urllib3.', 'http.client', 'ssl', 'socket')
+SQL_MODULE_PREFIXES = ('sqlalchemy.', 'psycopg', 'sqlite3')
+
+_query_counter = threading.local()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_query_counter, 'count', None) is not None:
+        _query_counter.count += 1
+
+
+def start_query_count():
+    _query_counter.count = 0
+
+
+def stop_query_count():
+    count = getattr(_query_counter, 'count', None) or 0
+    _query_counter.count = None
+    return count
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return f'{module}:{code.co_name}'
+
+
+class StackSampler:
+    """대상 스레드 스택을 interval초마다 샘플링하는 백그라운드 스레드 (요청 하나에 하나)"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(labels))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """flamegraph 호환 collapsed stack 텍스트 (많이 찍힌 순)"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def blocked_ms(self, prefixes):
+        """스택에 해당 모듈 프레임이 있는 샘플 비율 × 실행 시간 (ms)"""
+        if not self.samples:
+            return 0
+        hits = sum(count for stack, count in self.stacks.items()
+                   if any(frame.startswith(prefixes) for frame in stack.split(';')))
+        return round(self.duration * 1000 * hits / self.samples, 1)
+
+
+# ---------- 느린 쿼리 로그 ----------
+
+_SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+_SQL_PARAM = re.compile(r'%\([^)]*\)s|%s|:\w+|\?')
+_SQL_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SQL_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SQL_SPACE = re.compile(r'\s+')
+
+
+def normalize_sql(statement):
+    """리터럴·바인드 파라미터를 ?로 바꾸고 IN 목록/공백을 접어 같은 모양의 쿼리를 하나로 묶음"""
+    sql = _SQL_STRING.sub('?', statement)
+    sql = _SQL_PARAM.sub('?', sql)
+    sql = _SQL_NUMBER.sub('?', sql)
+    sql = _SQL_IN_LIST.sub('(?)', sql)
+    return _SQL_SPACE.sub(' ', sql).strip()
+
+
+def sql_fingerprint(normalized):
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+class SlowQueryLog:
+    """threshold_ms 이상 걸린 쿼리를 지문별로 집계 (워커 메모리, drain()으로 꺼내 DB에 누적)
+
+    지문이 처음 느려졌을 때 같은 연결에서 EXPLAIN을 한 번 떠 둔다 (SELECT만, ANALYZE 없이).
+    """
+
+    def __init__(self, threshold_ms):
+        self.threshold_ms = threshold_ms
+        self._pending = {}
+        self._explained = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def install(self):
+        event.listen(Engine, 'before_cursor_execute', self._before)
+        event.listen(Engine, 'after_cursor_execute', self._after)
+        return self
+
+    def paused(self):
+        """이 스레드에서 실행하는 쿼리(로그 저장 등)는 기록하지 않음"""
+        log = self
+
+        class _Paused:
+            def __enter__(self):
+                log._local.paused = True
+
+            def __exit__(self, *exc):
+                log._local.paused = False
+
+        return _Paused()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info['query_start'].pop()) * 1000
+        if elapsed_ms < self.threshold_ms or getattr(self._local, 'paused', False):
+            return
+        normalized = normalize_sql(statement)
+        fingerprint = sql_fingerprint(normalized)
+        plan = None
+        if fingerprint not in self._explained and not executemany:
+            self._explained.add(fingerprint)
+            plan = self._explain(conn, statement, parameters)
+        with self._lock:
+            entry = self._pending.get(fingerprint)
+            if entry is None:
+                entry = self._pending[fingerprint] = {
+                    'statement': normalized, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'plan': None,
+                }
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['plan'] = entry['plan'] or plan
+
+    def _explain(self, conn, statement, parameters):
+        if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return None
+        dialect = conn.dialect.name
+        prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+        # SQLAlchemy 이벤트를 거치지 않는 DBAPI 커서로 실행. PostgreSQL은 실패해도
+        # 요청 트랜잭션이 깨지지 않게 savepoint 안에서.
+        cursor = conn.connection.cursor()
+        savepoint = dialect == 'postgresql'
+        try:
+            if savepoint:
+                cursor.execute('SAVEPOINT slow_query_explain')
+            cursor.execute(prefix + statement, parameters)
+            plan = '\n'.join(str(row[-1]) for row in cursor.fetchall())
+            if savepoint:
+                cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+            return plan
+        except Exception as e:
+            if savepoint:
+                try:
+                    cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+                except Exception:
+                    pass
+            return f'EXPLAIN 실패: {e}'
+        finally:
+            cursor.close()
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def reset(self):
+        """집계 초기화 후 다시 느려지는 지문은 EXPLAIN을 새로 뜸"""
+        with self._lock:
+            self._pending = {}
+            self._explained = set()
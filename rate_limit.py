@@ -0,0 +1,93 @@
+"""gunicorn 워커들이 SQLite 파일 하나로 공유하는 토큰 버킷 (외부 API 호출 예산)
+
+우선순위별 하한(floor)을 둬서 낮은 우선순위는 버킷이 하한 이상 차 있을 때만 토큰을 가져간다.
+예) held 0, page 4, adhoc 10 → 공개 프록시 조회가 몰려도 마지막 10개는 보유 종목 갱신 몫으로 남음.
+토큰이 모자라면 실패 대신 우선순위별 최대 대기 시간까지 기다렸다가(지연) 다시 시도한다.
+"""
+import os
+import sqlite3
+import time
+
+
+class SharedTokenBucket:
+    def __init__(self, path, name, rate_per_min, capacity, floors, max_waits):
+        if rate_per_min <= 0:
+            raise ValueError(f'{name} 호출 예산(분당 {rate_per_min})은 0보다 커야 합니다')
+        self.path = path
+        self.name = name
+        self.rate = rate_per_min / 60.0  # 초당 충전량
+        self.capacity = capacity
+        self.floors = floors
+        self.max_waits = max_waits
+        self._ready = False
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        con = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        if not self._ready:
+            con.execute('CREATE TABLE IF NOT EXISTS buckets '
+                        '(name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+            con.execute('INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)',
+                        (self.name, float(self.capacity), time.time()))
+            self._ready = True
+        return con
+
+    def _update(self, floor, take):
+        """버킷을 현재 시각까지 충전하고 (take면) 하한 위에서 1개 차감. 반환: (성공 여부, 토큰이 생길 때까지 초, 남은 토큰)"""
+        con = self._connect()
+        try:
+            con.execute('BEGIN IMMEDIATE')  # 워커 간 읽기-수정-쓰기 직렬화
+            tokens, updated = con.execute('SELECT tokens, updated FROM buckets WHERE name = ?',
+                                          (self.name,)).fetchone()
+            now = time.time()
+            tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+            ok = tokens - 1 >= floor
+            if ok and take:
+                tokens -= 1
+            con.execute('UPDATE buckets SET tokens = ?, updated = ? WHERE name = ?', (tokens, now, self.name))
+            con.execute('COMMIT')
+            return ok, 0.0 if ok else (floor + 1 - tokens) / self.rate, tokens
+        finally:
+            con.close()
+
+    def acquire(self, priority):
+        """토큰 1개 획득. 모자라면 우선순위별 최대 대기 시간 안에서 충전을 기다림.
+        버킷 파일을 못 쓰면 호출을 막지 않는다 (fail-open)."""
+        floor = self.floors[priority]
+        deadline = time.monotonic() + self.max_waits[priority]
+        while True:
+            try:
+                ok, wait, _ = self._update(floor, take=True)
+            except (sqlite3.Error, OSError):
+                return True
+            if ok:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def retry_after(self, priority):
+        """해당 우선순위가 토큰을 얻을 수 있을 때까지 남은 초 (0이면 지금 가능)"""
+        try:
+            return self._update(self.floors[priority], take=False)[1]
+        except (sqlite3.Error, OSError):
+            return 0.0
+
+    def drain(self):
+        """업스트림이 429를 주면 버킷을 비워 모든 워커가 함께 물러나게 함"""
+        try:
+            con = self._connect()
+            try:
+                con.execute('UPDATE buckets SET tokens = 0, updated = ? WHERE name = ?', (time.time(), self.name))
+            finally:
+                con.close()
+        except (sqlite3.Error, OSError):
+            pass
+
+    def status(self):
+        try:
+            tokens = self._update(0, take=False)[2]
+        except (sqlite3.Error, OSError):
+            return None
+        return {'tokens': round(tokens, 1), 'capacity': self.capacity, 'rate_per_min': round(self.rate * 60, 1)}
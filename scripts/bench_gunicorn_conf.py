@@ -0,0 +1,32 @@
+"""부하 테스트 전용 gunicorn 설정 (scripts/bench_load.py가 -c로 지정)
+
+저장소의 gunicorn.conf.py 설정·훅을 그대로 쓰되, 마스터의 warm_up 전과 워커 fork 직후에
+app.get_http_session을 bench_load.OfflineSession으로 바꿔 끼워 외부 API 대신 가짜 업스트림을 보게 한다.
+모드는 BENCH_UPSTREAM(1|timeout), 응답 지연(초)은 BENCH_UPSTREAM_DELAY.
+"""
+import os
+import runpy
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import bench_load  # noqa: E402
+
+_base = runpy.run_path(os.path.join(bench_load.ROOT, 'gunicorn.conf.py'))
+bind = _base['bind']
+preload_app = _base['preload_app']
+
+
+def _install_offline_upstream():
+    import app
+    bench_load.install_offline_upstream(app, os.environ.get('BENCH_UPSTREAM', '1'),
+                                        float(os.environ.get('BENCH_UPSTREAM_DELAY', '0')))
+
+
+def when_ready(server):
+    _install_offline_upstream()
+    _base['when_ready'](server)
+
+
+def post_fork(server, worker):
+    _install_offline_upstream()
+    _base['post_fork'](server, worker)
@@ -0,0 +1,109 @@
+"""API 응답 직렬화/전송 크기 벤치마크 (Flask 기본 jsonify vs FastJSONProvider + 압축)
+
+사용법 (프로젝트 루트에서):
+    python scripts/bench_json.py [--holdings 30] [--users 40] [--repeat 2000]
+
+/api/assets, /api/ranking 과 같은 모양의 페이로드를 만들어
+직렬화 시간(건당 µs)과 전송 바이트(원본/gzip/brotli)를 비교한다.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+import api_encoding  # noqa: E402
+from api_encoding import FastJSONProvider, compress  # noqa: E402
+
+
+def make_assets_payload(n):
+    rnd = random.Random(1)
+    stocks = []
+    for i in range(n):
+        kr = i % 2 == 0
+        price = rnd.uniform(10, 90000)
+        stocks.append({
+            'id': i + 1,
+            'symbol': f'{rnd.randint(0, 999999):06d}' if kr else f'SYM{i}',
+            'name': '삼성전자' if kr else 'Bitmine Immersion Technologies',
+            'market': 'KR' if kr else 'US',
+            'currency': 'KRW' if kr else 'USD',
+            'shares': rnd.randint(1, 500),
+            'avg_price': round(price * 0.9, 2),
+            'current_price': round(price, 2),
+            'change_percent': round(rnd.uniform(-5, 5), 2),
+            'value_usd': round(rnd.uniform(0, 1e5), 2),
+            'value_krw': rnd.randint(0, 10 ** 8),
+            'cost_usd': round(rnd.uniform(0, 1e5), 2),
+            'cost_krw': rnd.randint(0, 10 ** 8),
+            'gain_usd': round(rnd.uniform(-1e4, 1e4), 2),
+            'gain_krw': rnd.randint(-10 ** 7, 10 ** 7),
+            'gain_percent': round(rnd.uniform(-50, 50), 2),
+            'stale': False,
+        })
+    return {
+        'stocks': stocks, 'cash_krw': 870338, 'total_stock_usd': 12345.67,
+        'total_stock_krw': 123456789, 'total_cost_krw': 100000000, 'total_gain_krw': 23456789,
+        'total_gain_percent': 23.46, 'total_assets_krw': 124327127, 'usd_krw': 1382.5,
+        'fx_stale': False, 'stale': False, 'updated_at': '2026.07.25 09:00',
+    }
+
+
+def make_ranking_payload(n):
+    rnd = random.Random(2)
+    rows = []
+    for i in range(n):
+        done = rnd.randint(0, 21)
+        rows.append({
+            'id': i + 1, 'name': f'참가자{i + 1}', 'penalty': (21 - done) * 10000,
+            'completed_days': done, 'total_workdays': 21,
+            'completion_rate': round(done / 21 * 100, 1), 'rank': i + 1,
+        })
+    return rows
+
+
+def bench(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--holdings', type=int, default=30)
+    parser.add_argument('--users', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    before = DefaultJSONProvider(app)
+    after = FastJSONProvider(app)
+
+    payloads = {
+        f'/api/assets ({args.holdings} holdings)': make_assets_payload(args.holdings),
+        f'/api/ranking ({args.users} users)': make_ranking_payload(args.users),
+    }
+
+    print(f"orjson={'on' if api_encoding.orjson else 'off'}, "
+          f"brotli={'on' if api_encoding.brotli else 'off'}, repeat={args.repeat}\n")
+    print('| payload | encoder | serialize µs | raw B | gzip B | br B |')
+    print('|---|---|---:|---:|---:|---:|')
+    with app.app_context():
+        for label, payload in payloads.items():
+            for name, provider in (('before: Flask default', before), ('after: FastJSONProvider', after)):
+                us = bench(lambda: provider.response(payload).get_data(), args.repeat)
+                body = provider.response(payload).get_data()
+                gz = len(compress(body, 'gzip'))
+                br = len(compress(body, 'br')) if api_encoding.brotli else '-'
+                print(f'| {label} | {name} | {us:,.1f} | {len(body):,} | {gz:,} | {br if br == "-" else f"{br:,}"} |')
+
+
+if __name__ == '__main__':
+    main()
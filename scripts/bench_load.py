@@ -0,0 +1,305 @@
+"""gunicorn 워커 구성별 부하 테스트: 동시 사용자 수에 따른 처리량/지연 표
+
+사용법 (프로젝트 루트에서):
+    python scripts/bench_load.py [--configs sync:1,sync:4,gthread:2x8,gthread:4x8]
+                                 [--concurrency 4,16,64] [--duration 20]
+                                 [--offline 1|timeout] [--upstream-delay 0.3]
+
+구성(워커 클래스:워커 수[x스레드 수])마다 시드 DB 복사본으로 `gunicorn app:app`을 새로 띄운다
+(scripts/bench_gunicorn_conf.py — gunicorn.conf.py 설정 그대로 preload + warm_up). 그 설정이 마스터와 워커에서
+app.get_http_session을 아래 OfflineSession으로 바꿔 끼우므로 시세·종목명·환율 제공자는 가짜 응답이다
+(브레이커·호출 예산은 그대로 거침. 앱 코드에는 가짜 데이터 경로가 없다):
+    --offline 1        심볼별 고정 시세를 --upstream-delay초 뒤 응답 (느린 업스트림)
+    --offline timeout  모든 외부 호출이 timeout(5초)까지 기다린 뒤 실패 (업스트림 장애, 브레이커 동작 포함)
+
+부하는 동시 사용자 수만큼의 스레드가 쉬지 않고 요청하는 closed-loop 방식이고 요청 비율은 --mix로 정한다
+(기본 calendar 35 · ranking 25 · assets 20 · toggle 20).
+자산 응답은 시세 세대마다 한 번 새로 만든다 (장중에는 1분, 휴장 중에는 다음 개장까지). 그래서 장중에 재야 현실적이다.
+부하 발생기도 파이썬 스레드이므로, 동시 연결이 수백 개를 넘으면 서버보다 클라이언트가 먼저 병목이 된다.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import date
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OPS = ('calendar', 'ranking', 'assets', 'toggle')
+SYMBOLS = ['005930', '000660', '035420', '035720', '051910', '005380', '068270', '105560',
+           'AAPL', 'MSFT', 'NVDA', 'TSLA', 'AMZN', 'GOOGL', 'META', 'AVGO']
+
+# 자식 프로세스에서 실행: 유저·기록·보유 종목을 시드하고 유저 id 목록을 JSON 한 줄로 출력
+SEED = r'''
+import json, random, sys
+from datetime import timedelta
+import app as app_module
+sys.path.insert(0, 'scripts')
+import bench_load
+bench_load.install_offline_upstream(app_module)
+from models import db, User, PushupRecord, StockHolding, CashAsset
+users, symbols = int(sys.argv[1]), sys.argv[2].split(',')
+rnd = random.Random(1)
+with app_module.app.app_context():
+    app_module.ensure_db_ready()
+    today = app_module.today_kst()
+    ids = []
+    for i in range(users):
+        user = User(name=f'부하{i:03d}')
+        db.session.add(user)
+        db.session.flush()
+        ids.append(user.id)
+        for days in range(1, 120):
+            if rnd.random() < 0.7:
+                db.session.add(PushupRecord(user_id=user.id, date=today - timedelta(days=days)))
+    for symbol in symbols:
+        db.session.add(StockHolding(symbol=symbol, shares=rnd.randint(1, 300), avg_price=0, added_by=ids[0]))
+    db.session.add(CashAsset(amount=1000000))
+    db.session.commit()
+    app_module.rebuild_month_completions()
+    for user in User.query:
+        app_module.rebuild_user_streak(user)
+    db.session.commit()
+print(json.dumps(ids))
+'''
+
+
+class _OfflineResponse:
+    def __init__(self, payload):
+        self.status_code = 200
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class OfflineSession:
+    """requests.Session 대신 쓰는 가짜 업스트림 (get만). 심볼별로 항상 같은 시세·종목명을 돌려준다.
+
+    mode='timeout'이면 요청 timeout만큼 기다린 뒤 예외 → 앱에서는 업스트림 장애로 집계된다.
+    """
+
+    def __init__(self, mode='1', delay=0.0, fx_rates=None):
+        self.mode = mode
+        self.delay = delay
+        self.fx_rates = dict(fx_rates or {}, EUR=0.92, JPY=150.0)
+
+    def get(self, url, params=None, timeout=5, **kwargs):
+        host = urlsplit(url).hostname or ''
+        if self.mode == 'timeout':
+            time.sleep(timeout)
+            raise TimeoutError(f'offline: {host} timeout')
+        if self.delay:
+            time.sleep(self.delay)
+        if host.endswith('er-api.com'):
+            return _OfflineResponse({'rates': self.fx_rates})
+        parts = url.rstrip('/').split('/')
+        symbol = (params or {}).get('symbol') or (parts[-2] if host.endswith('naver.com') else parts[-1])
+        seed = int(hashlib.md5(symbol.encode()).hexdigest()[:6], 16)
+        currency = 'KRW' if symbol.endswith(('.KS', '.KQ')) else 'USD'
+        price = 1000 + seed % 900 * 100 if currency == 'KRW' else 10 + seed % 90000 / 100
+        prev = round(price * (1 - (seed % 7 - 3) / 100), 2)
+        if host.endswith('naver.com'):
+            return _OfflineResponse({'stockName': f'오프라인 {symbol}'})
+        if host.endswith('finnhub.io'):
+            return _OfflineResponse({'c': price, 'pc': prev, 'd': price - prev, 'dp': (price - prev) / prev * 100,
+                                     'name': f'Offline {symbol}'})
+        return _OfflineResponse({'chart': {'result': [{'meta': {
+            'regularMarketPrice': price, 'chartPreviousClose': prev, 'currency': currency, 'shortName': symbol,
+        }}]}})
+
+
+def install_offline_upstream(app_module, mode='1', delay=0.0):
+    """app의 업스트림 세션을 OfflineSession으로 교체 (_provider_get의 브레이커·호출 예산은 그대로)"""
+    session = OfflineSession(mode, delay, app_module.FX_FALLBACK_RATES)
+    app_module.get_http_session = lambda: session
+
+
+def parse_config(spec):
+    """'gthread:4x8' → ('gthread', 4, 8)"""
+    worker_class, _, size = spec.partition(':')
+    workers, _, threads = (size or '1').partition('x')
+    return worker_class, int(workers), int(threads or 1)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def seed_database(path, users, holdings):
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{path}')
+    env.pop('DATABASE_REPLICA_URL', None)
+    out = subprocess.run(
+        [sys.executable, '-c', SEED, str(users), ','.join(SYMBOLS[:holdings])],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def start_server(spec, tmp, seed_db, args):
+    worker_class, workers, threads = parse_config(spec)
+    run_dir = tempfile.mkdtemp(dir=tmp)
+    db_path = os.path.join(run_dir, 'bench.db')
+    shutil.copy(seed_db, db_path)
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f'sqlite:///{db_path}',
+        PORT=str(port),
+        BENCH_UPSTREAM=args.offline,
+        BENCH_UPSTREAM_DELAY=str(args.upstream_delay),
+        FINNHUB_API_KEY=os.environ.get('FINNHUB_API_KEY') or 'offline',
+        RATE_LIMIT_DB=os.path.join(run_dir, 'rate-limit.sqlite3'),
+        ASSETS_CACHE_DIR=os.path.join(run_dir, 'assets-cache'),
+    )
+    env.pop('DATABASE_REPLICA_URL', None)
+    cmd = [sys.executable, '-m', 'gunicorn', 'app:app', '-c', os.path.join(ROOT, 'scripts', 'bench_gunicorn_conf.py'),
+           '-b', f'127.0.0.1:{port}', '-k', worker_class, '-w', str(workers), '--threads', str(threads),
+           '--timeout', '120', '--log-level', 'warning']
+    log = open(os.path.join(run_dir, 'gunicorn.log'), 'w')
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'gunicorn 기동 실패 ({spec}): {log.name}')
+        try:
+            urllib.request.urlopen(f'{base}/api/available-months', timeout=2).read()
+            return proc, base
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f'gunicorn 응답 없음 ({spec}): {log.name}')
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def build_request(base, op, user_id, today, rnd):
+    if op == 'calendar':
+        return urllib.request.Request(f'{base}/api/calendar/{today.year}/{today.month}?user_id={user_id}')
+    if op == 'ranking':
+        return urllib.request.Request(f'{base}/api/ranking?year={today.year}&month={today.month}')
+    if op == 'assets':
+        return urllib.request.Request(f'{base}/api/assets')
+    day = date(today.year, today.month, rnd.randint(1, today.day))
+    body = json.dumps({'user_id': user_id, 'date': day.isoformat()}).encode()
+    return urllib.request.Request(f'{base}/api/toggle', data=body, method='POST',
+                                  headers={'Content-Type': 'application/json'})
+
+
+def send(req):
+    """(성공 여부). 5xx·연결 오류·타임아웃만 실패로 셈"""
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            resp.read()
+            return True
+    except urllib.error.HTTPError as e:
+        return e.code < 500
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def run_load(base, concurrency, duration, mix, user_ids):
+    """closed-loop 부하. 반환: ([(op, ms, ok)], 경과 초)"""
+    today = date.today()
+    ops, weights = zip(*mix.items())
+    results = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(n):
+        rnd = random.Random(n)
+        user_id = user_ids[n % len(user_ids)]
+        local = []
+        while time.monotonic() < deadline:
+            op = rnd.choices(ops, weights)[0]
+            req = build_request(base, op, user_id, today, rnd)
+            started = time.perf_counter()
+            ok = send(req)
+            local.append((op, (time.perf_counter() - started) * 1000, ok))
+        with lock:
+            results.extend(local)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, time.monotonic() - started
+
+
+def percentile(values, p):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--configs', default='sync:1,sync:4,gthread:2x8,gthread:4x8',
+                        help='워커 클래스:워커 수[x스레드 수] 목록 (gevent는 설치된 경우)')
+    parser.add_argument('--concurrency', default='4,16,64', help='동시 사용자 수 목록')
+    parser.add_argument('--duration', type=float, default=20, help='단계별 측정 시간(초)')
+    parser.add_argument('--offline', default='1', choices=['1', 'timeout'])
+    parser.add_argument('--upstream-delay', type=float, default=0.3, help='--offline 1일 때 가짜 업스트림 응답 지연(초)')
+    parser.add_argument('--mix', default='calendar:35,ranking:25,assets:20,toggle:20')
+    parser.add_argument('--users', type=int, default=30)
+    parser.add_argument('--holdings', type=int, default=12, choices=range(1, len(SYMBOLS) + 1), metavar='N')
+    args = parser.parse_args()
+
+    mix = {op: float(w) for op, _, w in (item.partition(':') for item in args.mix.split(','))}
+    unknown = set(mix) - set(OPS)
+    if unknown:
+        parser.error(f'알 수 없는 요청 종류: {", ".join(sorted(unknown))}')
+    levels = [int(c) for c in args.concurrency.split(',')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_db = os.path.join(tmp, 'seed.db')
+        user_ids = seed_database(seed_db, args.users, args.holdings)
+        upstream = 'timeout (5s)' if args.offline == 'timeout' else f'{args.upstream_delay * 1000:.0f}ms'
+        print(f'offline upstream {upstream} · {args.users} users · {args.holdings} holdings · '
+              f'{args.duration:.0f}s per step · mix {args.mix}\n')
+        print('| config | users | req/s | p50 ms | p95 ms | p99 ms | '
+              + ' | '.join(f'{op} p95' for op in mix) + ' | errors |')
+        print('|---|---:|---:|---:|---:|---:|' + '---:|' * len(mix) + '---:|')
+        for spec in args.configs.split(','):
+            proc, base = start_server(spec, tmp, seed_db, args)
+            try:
+                for op in mix:  # 첫 요청 비용(자산 첫 빌드 등)은 측정에서 제외
+                    send(build_request(base, op, user_ids[0], date.today(), random.Random(0)))
+                for concurrency in levels:
+                    results, elapsed = run_load(base, concurrency, args.duration, mix, user_ids)
+                    latencies = [ms for _, ms, _ in results]
+                    per_op = [percentile([ms for o, ms, _ in results if o == op], 95) for op in mix]
+                    errors = sum(1 for *_, ok in results if not ok)
+                    print(f'| {spec} | {concurrency} | {len(results) / elapsed:.1f} | '
+                          f'{percentile(latencies, 50):.0f} | {percentile(latencies, 95):.0f} | '
+                          f'{percentile(latencies, 99):.0f} | '
+                          + ' | '.join(f'{v:.0f}' for v in per_op) + f' | {errors} |', flush=True)
+            finally:
+                stop_server(proc)
+
+
+if __name__ == '__main__':
+    main()
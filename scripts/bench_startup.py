@@ -0,0 +1,68 @@
+"""워커 기동 벤치마크: `import app` 시간과 첫 요청/두 번째 요청 지연
+
+사용법 (프로젝트 루트에서):
+    python scripts/bench_startup.py [--runs 5] [--path /api/ranking]
+
+매 회 새 파이썬 프로세스에서 임시 SQLite DB로 측정한다 (콜드 스타트 재현).
+이전 버전과 비교하려면 다른 체크아웃을 --app-dir로 지정:
+    git worktree add /tmp/pushups-base <ref>
+    python scripts/bench_startup.py --app-dir /tmp/pushups-base
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 자식 프로세스에서 실행: 측정값을 JSON 한 줄로 출력
+CHILD = r'''
+import json, sys, time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+client = app_module.app.test_client()
+t2 = time.perf_counter()
+status = client.get(sys.argv[1]).status_code
+t3 = time.perf_counter()
+client.get(sys.argv[1])
+t4 = time.perf_counter()
+print(json.dumps({'import_ms': (t1 - t0) * 1000, 'first_ms': (t3 - t2) * 1000,
+                  'second_ms': (t4 - t3) * 1000, 'status': status}))
+'''
+
+
+def run_once(app_dir, path):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        out = subprocess.run(
+            [sys.executable, '-c', CHILD, path],
+            cwd=app_dir, env=env, capture_output=True, text=True, check=True,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--path', default='/api/ranking')
+    parser.add_argument('--app-dir', default=ROOT)
+    args = parser.parse_args()
+
+    results = [run_once(args.app_dir, args.path) for _ in range(args.runs)]
+    print(f'{args.app_dir} · GET {args.path} · {args.runs} runs (status {results[0]["status"]})\n')
+    print('| metric | median ms | min ms |')
+    print('|---|---:|---:|')
+    for key, label in (('import_ms', 'import app'), ('first_ms', 'first request'),
+                       ('second_ms', 'second request')):
+        values = [r[key] for r in results]
+        print(f'| {label} | {statistics.median(values):.1f} | {min(values):.1f} |')
+    total = [r['import_ms'] + r['first_ms'] for r in results]
+    print(f'| import + first request | {statistics.median(total):.1f} | {min(total):.1f} |')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""정적 번들 빌드: templates/index.html의 인라인 CSS/JS를 해시 파일로 추출.
+
+사용법 (프로젝트 루트에서):
+    python scripts/build_assets.py
+
+결과물 (static/dist/, git 미추적):
+    app.<hash>.css / app.<hash>.js   콘텐츠 해시 파일명 → WhiteNoise가 1년 immutable 캐시로 서빙
+    *.gz / *.br                      사전 압축본 (WhiteNoise가 Accept-Encoding에 맞춰 자동 선택)
+    index.html (+ .gz/.br)           CSS/JS를 외부 참조하는 HTML 셸 → app.py가 메모리에 올려 서빙
+    asset-manifest.json              해시 자산 목록 → 서비스 워커 프리캐시 목록 생성에 사용
+
+빌드 결과가 없으면 app.py는 기존처럼 템플릿을 그대로 렌더링한다.
+로컬에서 템플릿을 고친 뒤에는 다시 빌드하거나 static/dist/를 지울 것 (셸은 서버 기동 시 한 번만 읽음).
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성: 없으면 gzip만 생성
+    brotli = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_PATH = os.path.join(ROOT, 'templates', 'index.html')
+DIST_DIR = os.path.join(ROOT, 'static', 'dist')
+DIST_URL = '/static/dist'
+MANIFEST_NAME = 'asset-manifest.json'
+
+STYLE_RE = re.compile(r'[ \t]*<style>\n?(.*?)[ \t]*</style>\n', re.S)
+SCRIPT_RE = re.compile(r'[ \t]*<script>\n?(.*?)[ \t]*</script>\n', re.S)
+
+# 셸과 함께 프리캐시할 고정 자산
+EXTRA_PRECACHE = [
+    '/static/manifest.json',
+    '/static/icons/icon-192.png',
+]
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def write_compressed(path, data):
+    """원본 + gzip(+brotli) 사전 압축본 기록"""
+    with open(path, 'wb') as f:
+        f.write(data)
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def extract(html, pattern, label):
+    matches = pattern.findall(html)
+    if len(matches) != 1:
+        sys.exit(f'{label} 블록이 정확히 1개여야 합니다 (발견: {len(matches)}개)')
+    return matches[0]
+
+
+def build():
+    with open(TEMPLATE_PATH, encoding='utf-8') as f:
+        html = f.read()
+
+    css = extract(html, STYLE_RE, '<style>').encode('utf-8')
+    js = extract(html, SCRIPT_RE, '<script>').encode('utf-8')
+    css_name = f'app.{content_hash(css)}.css'
+    js_name = f'app.{content_hash(js)}.js'
+    css_url = f'{DIST_URL}/{css_name}'
+    js_url = f'{DIST_URL}/{js_name}'
+
+    # 셸: 인라인 블록을 외부 참조로 교체 (스크립트는 원래 위치 그대로 body 끝에서 실행)
+    shell = STYLE_RE.sub(lambda m: f'    <link rel="stylesheet" href="{css_url}">\n', html, count=1)
+    shell = SCRIPT_RE.sub(lambda m: f'    <script src="{js_url}"></script>\n', shell, count=1)
+    shell = shell.encode('utf-8')
+    build_id = content_hash(shell)
+
+    os.makedirs(DIST_DIR, exist_ok=True)
+    for name in os.listdir(DIST_DIR):  # 이전 빌드 정리
+        os.remove(os.path.join(DIST_DIR, name))
+
+    write_compressed(os.path.join(DIST_DIR, css_name), css)
+    write_compressed(os.path.join(DIST_DIR, js_name), js)
+    write_compressed(os.path.join(DIST_DIR, 'index.html'), shell)
+
+    manifest = {
+        'build_id': build_id,
+        'shell': 'index.html',
+        'css': css_url,
+        'js': js_url,
+        'precache': ['/', css_url, js_url] + EXTRA_PRECACHE,
+    }
+    with open(os.path.join(DIST_DIR, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f'build {build_id}: {css_name} ({len(css):,} B), {js_name} ({len(js):,} B), '
+          f'shell {len(shell):,} B, brotli={"on" if brotli else "off"}')
+    return manifest
+
+
+if __name__ == '__main__':
+    build()
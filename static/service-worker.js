@@ -1,13 +1,37 @@
-const CACHE_NAME = 'pushups-v21';
-const STATIC_CACHE = 'pushups-static-v21';
+// 빌드 결과가 있으면 /service-worker.js 라우트가 아래 두 줄을 해시 자산 매니페스트로 치환
+// (scripts/build_assets.py → static/dist/asset-manifest.json)
+const BUILD_ID = 'dev';
+const BUILD_ASSETS = [];
 
-// 캐시할 정적 리소스
-const STATIC_ASSETS = [
+const CACHE_NAME = `pushups-v23-${BUILD_ID}`;  // GET API 응답 (stale-while-revalidate)
+const STATIC_CACHE = `pushups-static-v23-${BUILD_ID}`;
+
+// 캐시할 정적 리소스 (빌드 전 개발 환경은 셸과 매니페스트만)
+const STATIC_ASSETS = BUILD_ASSETS.length ? BUILD_ASSETS : [
   '/',
-  '/static/manifest.json',
-  'https://fonts.googleapis.com/css2?family=Noto+Sans+KR:wght@400;500;600;700;800&display=swap'
+  '/static/manifest.json'
 ];
 
+// 캐시에서 먼저 응답하고 백그라운드에서 갱신하는 GET API
+const SWR_API_PATHS = ['/api/calendar/', '/api/ranking', '/api/event'];
+
+// 쓰기 요청 성공 시 지울 API 캐시 (나머지 쓰기는 API 캐시 전체 삭제)
+const WRITE_INVALIDATES = {
+  '/api/toggle': ['/api/calendar/', '/api/ranking'],
+  '/api/event/join': ['/api/event'],
+  '/api/event/leave': ['/api/event'],
+};
+
+// 오프라인 토글 큐 (IndexedDB) — 온라인이 되면 Background Sync로 재전송
+const OUTBOX_DB = 'pushups-outbox';
+const OUTBOX_STORE = 'requests';
+const OUTBOX_SYNC_TAG = 'replay-outbox';
+
+const offlineResponse = () => new Response(
+  JSON.stringify({ error: '오프라인 상태입니다' }),
+  { headers: { 'Content-Type': 'application/json' } }
+);
+
 // 서비스 워커 설치
 self.addEventListener('install', (event) => {
   event.waitUntil(
@@ -29,22 +53,164 @@ self.addEventListener('activate', (event) => {
         );
       })
       .then(() => self.clients.claim())
+      .then(() => replayOutbox().catch(() => {}))
   );
 });
 
-// 네트워크 요청 처리 (Network First 전략)
-self.addEventListener('fetch', (event) => {
-  // API 요청은 항상 네트워크 우선
-  if (event.request.url.includes('/api/')) {
-    event.respondWith(
-      fetch(event.request)
-        .catch(() => {
-          return new Response(
-            JSON.stringify({ error: '오프라인 상태입니다' }),
-            { headers: { 'Content-Type': 'application/json' } }
-          );
-        })
+// ---------- IndexedDB 큐 ----------
+
+function openOutbox() {
+  return new Promise((resolve, reject) => {
+    const req = indexedDB.open(OUTBOX_DB, 1);
+    req.onupgradeneeded = () => req.result.createObjectStore(OUTBOX_STORE, { keyPath: 'id', autoIncrement: true });
+    req.onsuccess = () => resolve(req.result);
+    req.onerror = () => reject(req.error);
+  });
+}
+
+function outboxTx(mode, fn) {
+  return openOutbox().then((db) => new Promise((resolve, reject) => {
+    const tx = db.transaction(OUTBOX_STORE, mode);
+    const result = fn(tx.objectStore(OUTBOX_STORE));
+    tx.oncomplete = () => { db.close(); resolve(result && result.result); };
+    tx.onerror = () => { db.close(); reject(tx.error); };
+  }));
+}
+
+const outboxAdd = (item) => outboxTx('readwrite', (store) => store.add(item));
+const outboxAll = () => outboxTx('readonly', (store) => store.getAll());
+const outboxDelete = (id) => outboxTx('readwrite', (store) => store.delete(id));
+
+async function notifyClients(message) {
+  const clientList = await self.clients.matchAll({ includeUncontrolled: true });
+  clientList.forEach((client) => client.postMessage(message));
+}
+
+// 큐에 쌓인 요청을 순서대로 재전송. 네트워크 실패면 중단하고 throw → 브라우저가 sync 재시도
+let replaying = null;
+function replayOutbox() {
+  if (replaying) return replaying;
+  replaying = (async () => {
+    const items = await outboxAll();
+    let sent = 0;
+    for (const item of items) {
+      const res = await fetch(item.url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: item.body,
+      });
+      // 4xx(미래 날짜 등)는 재시도해도 같으므로 버림
+      if (res.ok || (res.status >= 400 && res.status < 500)) {
+        await outboxDelete(item.id);
+        sent++;
+      } else {
+        throw new Error(`replay failed: ${res.status}`);
+      }
+    }
+    if (sent) {
+      await invalidateApiCache(WRITE_INVALIDATES['/api/toggle']);
+      await notifyClients({ type: 'outbox-flushed', count: sent });
+    }
+  })().finally(() => { replaying = null; });
+  return replaying;
+}
+
+self.addEventListener('sync', (event) => {
+  if (event.tag === OUTBOX_SYNC_TAG) event.waitUntil(replayOutbox());
+});
+
+// Background Sync 미지원 브라우저: 페이지가 online 이벤트 때 재전송 요청
+self.addEventListener('message', (event) => {
+  const type = event.data && event.data.type;
+  if (type === 'replay-outbox') {
+    event.waitUntil(replayOutbox().catch(() => {}));
+  } else if (type === 'clear-api-cache') {
+    event.waitUntil(caches.delete(CACHE_NAME));
+  }
+});
+
+// ---------- API 캐시 ----------
+
+async function invalidateApiCache(prefixes) {
+  const cache = await caches.open(CACHE_NAME);
+  const keys = await cache.keys();
+  await Promise.all(keys
+    .filter((req) => !prefixes || prefixes.some((p) => new URL(req.url).pathname.startsWith(p)))
+    .map((req) => cache.delete(req)));
+}
+
+// stale-while-revalidate: 캐시가 있으면 즉시 응답, 네트워크 응답이 달라졌으면 페이지에 새 본문 전달
+async function staleWhileRevalidate(event) {
+  const cache = await caches.open(CACHE_NAME);
+  const cached = await cache.match(event.request);
+
+  const revalidate = fetch(event.request).then(async (networkResponse) => {
+    if (networkResponse.ok) {
+      const body = await networkResponse.clone().text();
+      const oldBody = cached ? await cached.clone().text() : null;
+      await cache.put(event.request, networkResponse.clone());
+      if (cached && body !== oldBody) {
+        await notifyClients({ type: 'api-updated', url: event.request.url, body: JSON.parse(body) });
+      }
+    }
+    return networkResponse;
+  });
+
+  if (cached) {
+    event.waitUntil(revalidate.catch(() => {}));
+    return cached;
+  }
+  return revalidate.catch(offlineResponse);
+}
+
+// 토글: 네트워크 실패 시 IndexedDB에 넣고 202(queued) 응답
+async function toggleWithQueue(request) {
+  const body = await request.clone().text();
+  try {
+    const res = await fetch(request);
+    if (res.ok) await invalidateApiCache(WRITE_INVALIDATES['/api/toggle']);
+    return res;
+  } catch (err) {
+    await outboxAdd({ url: request.url, body, queuedAt: Date.now() });
+    await invalidateApiCache(WRITE_INVALIDATES['/api/toggle']);
+    if (self.registration.sync) {
+      await self.registration.sync.register(OUTBOX_SYNC_TAG).catch(() => {});
+    }
+    return new Response(
+      JSON.stringify({ queued: true }),
+      { status: 202, headers: { 'Content-Type': 'application/json' } }
     );
+  }
+}
+
+// 그 외 쓰기: 네트워크 전용, 성공하면 관련 API 캐시 삭제
+async function writeThrough(request, path) {
+  try {
+    const res = await fetch(request);
+    if (res.ok) await invalidateApiCache(WRITE_INVALIDATES[path]);
+    return res;
+  } catch (err) {
+    return offlineResponse();
+  }
+}
+
+// 네트워크 요청 처리
+self.addEventListener('fetch', (event) => {
+  const url = new URL(event.request.url);
+
+  if (url.pathname.startsWith('/api/')) {
+    if (event.request.method === 'GET') {
+      if (SWR_API_PATHS.some((p) => url.pathname.startsWith(p))) {
+        event.respondWith(staleWhileRevalidate(event));
+      } else {
+        // 그 외 API(/api/sync, /api/assets 등)는 항상 네트워크
+        event.respondWith(fetch(event.request).catch(offlineResponse));
+      }
+    } else if (event.request.method === 'POST' && url.pathname === '/api/toggle') {
+      event.respondWith(toggleWithQueue(event.request));
+    } else {
+      event.respondWith(writeThrough(event.request, url.pathname));
+    }
     return;
   }
 
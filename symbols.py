@@ -0,0 +1,151 @@
+"""종목 마스터 (KRX + 미국 상장 종목) 와 자동완성용 접두사 인덱스
+
+data/symbols.csv (symbol,name,market,aliases) 를 읽어 정렬된 키 배열 하나로 만든다.
+키 = 심볼, 종목명, 별칭(한/영)의 단어 시작 접미사 (한글 이름은 두 글자 이상 모든 접미사 → "전자"로 삼성전자 검색).
+검색은 bisect로 접두사 구간을 찾아 앞쪽 일부만 점수화하므로 종목 수와 무관하게 1ms 미만.
+마스터 갱신: `flask refresh-symbols` (KIND 상장법인 목록 + nasdaqtrader 심볼 디렉터리).
+"""
+import csv
+import io
+import os
+import re
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+SymbolEntry = namedtuple('SymbolEntry', 'symbol name market aliases')
+
+_WORD_SPLIT = re.compile(r"[\s\-/(),.&']+")
+_HANGUL = re.compile(r'[가-힣]')
+SEARCH_SCAN_LIMIT = 200  # 접두사 구간에서 점수화할 최대 키 수 (짧은 키가 앞에 오므로 충분)
+
+
+def _normalize(text):
+    return ''.join(_WORD_SPLIT.split(text.lower()))
+
+
+def _index_keys(term):
+    """한 용어에서 만들 검색 키 (정규화된 접미사들)"""
+    words = [w for w in _WORD_SPLIT.split(term.lower()) if w]
+    keys = {''.join(words[i:]) for i in range(len(words))}
+    if _HANGUL.search(term):
+        joined = ''.join(words)
+        keys.update(joined[i:] for i in range(1, len(joined) - 1))
+    return keys
+
+
+class SymbolIndex:
+    def __init__(self, entries):
+        self.entries = entries
+        self.by_symbol = {e.symbol: e for e in entries}
+        self._names = [_normalize(e.name) for e in entries]
+        pairs = []
+        for i, e in enumerate(entries):
+            terms = {e.symbol, e.name, *e.aliases}
+            for key in set().union(*(_index_keys(t) for t in terms if t)):
+                pairs.append((key, i))
+        pairs.sort()
+        self._keys = [k for k, _ in pairs]
+        self._ids = array('I', (i for _, i in pairs))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, symbol):
+        return self.by_symbol.get(symbol)
+
+    def search(self, query, limit=10, market=None):
+        """접두사 검색. 정렬: 심볼 일치 > 심볼 접두사 > 이름 시작 > 단어/중간 일치, 같으면 짧은 이름 우선"""
+        q = _normalize(query or '')
+        if not q:
+            return []
+        lo = bisect_left(self._keys, q)
+        hi = min(bisect_left(self._keys, q + '\uffff'), lo + SEARCH_SCAN_LIMIT)
+        best = {}
+        for pos in range(lo, hi):
+            i = self._ids[pos]
+            entry = self.entries[i]
+            if market and entry.market != market:
+                continue
+            sym = entry.symbol.lower()
+            if sym == q:
+                score = 0
+            elif sym.startswith(q):
+                score = 1
+            elif self._names[i].startswith(q):
+                score = 2
+            else:
+                score = 3
+            if i not in best or score < best[i]:
+                best[i] = score
+        ranked = sorted(best, key=lambda i: (best[i], len(self.entries[i].name), self.entries[i].symbol))
+        return [self.entries[i] for i in ranked[:limit]]
+
+
+def read_symbols(path):
+    entries = []
+    with open(path, encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            symbol = (row.get('symbol') or '').strip()
+            name = (row.get('name') or '').strip()
+            if not symbol or not name:
+                continue
+            aliases = tuple(a.strip() for a in (row.get('aliases') or '').split('|') if a.strip())
+            entries.append(SymbolEntry(symbol, name, (row.get('market') or '').strip(), aliases))
+    return entries
+
+
+def write_symbols(path, entries):
+    """임시 파일에 쓰고 rename (읽는 워커가 반쯤 쓴 파일을 보지 않게)"""
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['symbol', 'name', 'market', 'aliases'])
+        for e in sorted(entries, key=lambda e: (e.market, e.symbol)):
+            writer.writerow([e.symbol, e.name, e.market, '|'.join(e.aliases)])
+    os.replace(tmp, path)
+
+
+# ---------- 마스터 갱신 (업스트림 목록 파싱) ----------
+
+KIND_LIST_URL = 'https://kind.krx.co.kr/corpgeneral/corpList.do?method=download&searchType=13'
+NASDAQ_LISTED_URL = 'https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt'
+OTHER_LISTED_URL = 'https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt'
+
+_TAG = re.compile(r'<[^>]+>')
+_US_NAME_SUFFIX = re.compile(r'\s+-\s+.*$|\s+(Common Stock|Ordinary Shares|Class [A-Z] Common Stock)$')
+
+
+def parse_kind_listing(html):
+    """KIND 상장법인 목록 (엑셀 다운로드 = HTML 표) → [(종목코드, 회사명)]"""
+    rows = re.findall(r'<tr[^>]*>(.*?)</tr>', html, re.S | re.I)
+    if not rows:
+        return []
+    header = [_TAG.sub('', c).strip() for c in re.findall(r'<t[hd][^>]*>(.*?)</t[hd]>', rows[0], re.S | re.I)]
+    try:
+        name_col, code_col = header.index('회사명'), header.index('종목코드')
+    except ValueError:
+        return []
+    result = []
+    for row in rows[1:]:
+        cells = [_TAG.sub('', c).strip() for c in re.findall(r'<td[^>]*>(.*?)</td>', row, re.S | re.I)]
+        if len(cells) <= max(name_col, code_col):
+            continue
+        code = cells[code_col].zfill(6)
+        if code.isdigit() and len(code) == 6 and cells[name_col]:
+            result.append((code, cells[name_col]))
+    return result
+
+
+def parse_nasdaq_directory(text, symbol_field):
+    """nasdaqtrader 심볼 디렉터리 (| 구분) → [(심볼, 종목명)]. 테스트 종목·우선주/워런트 표기 제외."""
+    result = []
+    reader = csv.DictReader(io.StringIO(text), delimiter='|')
+    for row in reader:
+        symbol = (row.get(symbol_field) or '').strip()
+        if not symbol.isalpha() or row.get('Test Issue') == 'Y':
+            continue  # 마지막 줄 "File Creation Time" 도 여기서 걸러짐
+        name = _US_NAME_SUFFIX.sub('', (row.get('Security Name') or '').strip())
+        if name:
+            result.append((symbol, name))
+    return result
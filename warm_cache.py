@@ -0,0 +1,68 @@
+"""시세·종목명·환율의 영구 캐시 계층 (primary DB의 market_cache 테이블, 모든 워커가 공유)
+
+메모리 캐시(_price_cache 등)에 쓸 때 함께 기록(write-through)하고, 프로세스가 뜰 때 전부 읽어
+메모리 캐시를 채운다 → 재시작 직후 첫 자산 조회가 업스트림을 순서대로 기다리지 않음.
+Render 무료 플랜은 스핀다운·재배포 때 파일시스템이 지워지므로 파일이 아니라 DB에 둔다.
+요청 트랜잭션과 섞이지 않도록 엔진에서 별도 연결로 읽고 쓴다 (실패는 무시 — 최적화일 뿐).
+값은 JSON, 시각은 epoch 초. expires_at이 없는 종류(종목명·환율)는 호출부가 TTL로 판단.
+"""
+import json
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+
+class WarmCache:
+    def __init__(self, table, get_engine):
+        self.table = table
+        self._get_engine = get_engine
+
+    def _select(self):
+        t = self.table
+        return select(t.c.kind, t.c.key, t.c.fetched_at, t.c.value, t.c.expires_at)
+
+    def put(self, kind, key, fetched_at, value, expires_at=None):
+        t = self.table
+        values = {'fetched_at': fetched_at, 'expires_at': expires_at,
+                  'value': json.dumps(value, ensure_ascii=False)}
+        try:
+            with self._get_engine().begin() as conn:
+                updated = conn.execute(t.update().where(t.c.kind == kind, t.c.key == key).values(**values)).rowcount
+                if not updated:
+                    conn.execute(t.insert().values(kind=kind, key=key, **values))
+        except IntegrityError:
+            pass  # 다른 워커가 같은 키를 먼저 넣음
+        except (SQLAlchemyError, TypeError, ValueError):
+            pass
+
+    def get(self, kind, key):
+        """(fetched_at, value, expires_at) 또는 None"""
+        t = self.table
+        try:
+            with self._get_engine().connect() as conn:
+                row = conn.execute(self._select().where(t.c.kind == kind, t.c.key == key)).first()
+        except SQLAlchemyError:
+            return None
+        return (row.fetched_at, json.loads(row.value), row.expires_at) if row else None
+
+    def load_all(self):
+        """{kind: {key: (fetched_at, value, expires_at)}}"""
+        result = {}
+        try:
+            with self._get_engine().connect() as conn:
+                rows = conn.execute(self._select()).all()
+        except SQLAlchemyError:
+            return result
+        for row in rows:
+            try:
+                result.setdefault(row.kind, {})[row.key] = (row.fetched_at, json.loads(row.value), row.expires_at)
+            except ValueError:
+                continue
+        return result
+
+    def clear(self, kind):
+        try:
+            with self._get_engine().begin() as conn:
+                conn.execute(self.table.delete().where(self.table.c.kind == kind))
+        except SQLAlchemyError:
+            pass